@@ -14,20 +14,38 @@ import os
 
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Quick-start development settings - unsuitable for production
+# Settings profile, `development` (default) or `production`. The profile only
+# picks defaults, every value below can still be overridden from the environment.
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
+PRODUCTION = os.environ.get('DJANGO_PROFILE', 'development') == 'production'
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ('1', 'true', 'yes', 'on')
+
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-$fmf@fr5a@)h92i*7=d+&-i7!+k$!s_(&r-q6l#&2ldc+h#5aq'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    if PRODUCTION:
+        raise ImproperlyConfigured('DJANGO_SECRET_KEY is required in the production profile.')
+    SECRET_KEY = 'django-insecure-$fmf@fr5a@)h92i*7=d+&-i7!+k$!s_(&r-q6l#&2ldc+h#5aq'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', not PRODUCTION)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+if not ALLOWED_HOSTS and PRODUCTION:
+    # Without DEBUG an empty list rejects every request with DisallowedHost.
+    raise ImproperlyConfigured('DJANGO_ALLOWED_HOSTS is required in the production profile.')
 
 
 # Application definition
@@ -39,14 +57,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'drf_spectacular',
     'rest_framework',
     'rest_framework.authtoken',
-    'book'
+    'book',
+    'user',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,8 +76,39 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.RequestProfilingMiddleware',
 ]
 
+# Prometheus metrics served at /metrics, see core/metrics.py. With a TOKEN
+# set, scrapes must send `Authorization: Bearer <token>`.
+METRICS = {
+    'ENABLED': env_bool('METRICS_ENABLED', True),
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+# Per-request query and timing report, see core/middleware.py.
+REQUEST_PROFILING = {
+    'ENABLED': env_bool('REQUEST_PROFILING', False),
+    'DUPLICATE_THRESHOLD': int(os.environ.get('REQUEST_PROFILING_DUPLICATE_THRESHOLD', 2)),
+}
+
+# Response compression, see core/middleware.py. Responses below MIN_SIZE
+# bytes, routes (URL names) in EXCLUDE_ROUTES and content types missing
+# from CONTENT_TYPES are sent uncompressed. HTML pages carry CSRF tokens,
+# so compressing them would expose the tokens to BREACH.
+COMPRESSION = {
+    'ENABLED': env_bool('COMPRESSION_ENABLED', True),
+    'MIN_SIZE': int(os.environ.get('COMPRESSION_MIN_SIZE', 1024)),
+    'GZIP_LEVEL': int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6)),
+    'BROTLI_QUALITY': int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4)),
+    'EXCLUDE_ROUTES': [route for route in os.environ.get('COMPRESSION_EXCLUDE_ROUTES', '').split(',') if route],
+    'CONTENT_TYPES': [
+        content_type for content_type
+        in os.environ.get('COMPRESSION_CONTENT_TYPES', 'application/json,application/x-ndjson').split(',')
+        if content_type
+    ],
+}
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -86,11 +139,67 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        # Keep connections open across requests in production, checking them
+        # before reuse so a restarted database does not fail the next request.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600 if PRODUCTION else 0)),
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', PRODUCTION),
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Response cache for book reads, see book/cache.py. A timeout of 0 disables it.
+BOOK_CACHE_ALIAS = 'default'
+BOOK_CACHE_TIMEOUT = int(os.environ.get('BOOK_CACHE_TIMEOUT', 300))
+
+
+# In-process cache for token authentication, see user/authentication.py.
+TOKEN_AUTH_CACHE = {
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 60)),
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000)),
+    'SHARED_CACHE_ALIAS': os.environ.get('TOKEN_AUTH_SHARED_CACHE'),
+}
+
+
+# Password hashing, see core/hashing.py. ITERATIONS of 0 keeps Django's
+# default cost; changing it rehashes stored passwords on their next login.
+
+PASSWORD_HASHERS = [
+    'core.hashing.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    'ITERATIONS': int(os.environ.get('PASSWORD_HASH_ITERATIONS', 0)),
+    'WORKERS': int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)),
+    'QUEUE_SIZE': int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 16)),
+    'TIMEOUT': float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5)),
+}
+
+AUTHENTICATION_BACKENDS = ['user.backends.PooledModelBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -110,6 +219,21 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -134,9 +258,28 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+# JSON encoding of API responses and request bodies: 'orjson' (falls back
+# to the stdlib when orjson is not installed) or 'stdlib'.
+API_JSON_BACKEND = os.environ.get('API_JSON_BACKEND', 'orjson')
+JSON_RENDERER, JSON_PARSER = {
+    'orjson': ('core.renderers.ORJSONRenderer', 'core.renderers.ORJSONParser'),
+    'stdlib': ('rest_framework.renderers.JSONRenderer', 'rest_framework.parsers.JSONParser'),
+}[API_JSON_BACKEND]
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'book.pagination.IdCursorPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 25)),
+    'DEFAULT_RENDERER_CLASSES': [JSON_RENDERER, 'rest_framework.renderers.BrowsableAPIRenderer'],
+    'DEFAULT_PARSER_CLASSES': [JSON_PARSER, 'rest_framework.parsers.FormParser', 'rest_framework.parsers.MultiPartParser'],
 }
 
+# Reviews embedded in book payloads; the full list is paginated under review-manage.
+BOOK_EMBEDDED_REVIEWS = int(os.environ.get('BOOK_EMBEDDED_REVIEWS', 5))
+BOOK_EMBEDDED_REVIEWS_ORDERING = {
+    'newest': ['-id'],
+    'top': ['-rating', '-id'],
+}[os.environ.get('BOOK_EMBEDDED_REVIEWS_ORDER', 'newest')]
+
 
 
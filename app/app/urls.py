@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView
@@ -24,8 +25,10 @@ from drf_spectacular.views import (
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='api-schema'), name='api-docs-ui'),
     path('api/user/', include('user.urls')),
     path('api/book/', include('book.urls')),
+    path('api/async/book/', include('book.async_urls')),
 ]
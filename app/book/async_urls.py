@@ -0,0 +1,12 @@
+from django.urls import path
+
+from book import async_views
+
+app_name = 'book-async'
+
+urlpatterns = [
+    path('books/', async_views.AsyncBookListView.as_view(), name='book-list'),
+    path('books/<int:pk>/', async_views.AsyncBookDetailView.as_view(), name='book-detail'),
+    path('books/<int:pk>/review-manage/', async_views.AsyncBookReviewListView.as_view(), name='book-review-manage'),
+    path('publishers/', async_views.AsyncPublisherListView.as_view(), name='publisher-list'),
+]
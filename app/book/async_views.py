@@ -0,0 +1,115 @@
+"""Async entry points for the read-heavy book endpoints.
+
+Served under ASGI these keep slow clients and cache hits on the event
+loop: authentication goes through the token cache (falling back to the
+async ORM). Actions the viewset also implements as coroutines (`alist`,
+`aretrieve`) run natively: the viewset builds the same filtered and
+ordered queries and reads them through the async ORM, with keyset
+pagination, conditional GET and the response cache, so the payloads
+equal the WSGI endpoints'. Other actions run the regular viewset action
+through `sync_to_async`.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+from book.cache import acached_hit
+from book.views import BookApiView, PublisherApiView
+from user.authentication import CachedTokenAuthentication
+
+
+class AsyncReadView(View):
+    viewset = None
+    actions = {'get': 'list'}
+    initkwargs = {}
+    cached = True
+    book_kwarg = None
+    viewset_view = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        viewset_view = cls.viewset.as_view(cls.actions, **cls.initkwargs)
+        return super().as_view(viewset_view=viewset_view, **initkwargs)
+
+    @staticmethod
+    def _json_response(data):
+        # The first default renderer is the configured JSON one.
+        return HttpResponse(api_settings.DEFAULT_RENDERER_CLASSES[0]().render(data), content_type='application/json')
+
+    @staticmethod
+    def _error_response(exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if exc.status_code == 401:
+            response['WWW-Authenticate'] = CachedTokenAuthentication.keyword
+        return response
+
+    def _render(self, request, **kwargs):
+        response = self.viewset_view(request, **kwargs)
+        return response.render()
+
+    async def _arender(self, request, action, auth, **kwargs):
+        """Run the viewset's `a{action}` the way `APIView.dispatch` runs actions.
+
+        `initial()` (content negotiation, versioning, permissions and
+        throttles) and the exception handler are the viewset's own; only
+        authentication differs, it was already done on the event loop.
+        """
+        view = self.viewset(action_map=self.actions, args=(), kwargs=kwargs, format_kwarg=None)
+        drf_request = view.initialize_request(request, **kwargs)
+        drf_request.user, drf_request.auth = auth
+        view.request = drf_request
+        view.headers = view.default_response_headers
+        try:
+            await sync_to_async(view.initial)(drf_request, **kwargs)
+            response = await getattr(view, f'a{action}')(drf_request, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+
+        return view.finalize_response(drf_request, response, **kwargs)
+
+    async def get(self, request, **kwargs):
+        try:
+            auth = await CachedTokenAuthentication().aauthenticate(request)
+            if auth is None:
+                raise exceptions.NotAuthenticated()
+        except exceptions.APIException as exc:
+            return self._error_response(exc)
+
+        action = self.actions['get']
+        if hasattr(self.viewset, f'a{action}'):
+            return await self._arender(request, action, auth, **kwargs)
+
+        if self.cached:
+            book_id = kwargs.get(self.book_kwarg) if self.book_kwarg else None
+            response = await acached_hit(request, self._json_response, book_id=book_id)
+            if response is not None:
+                return response
+
+        return await sync_to_async(self._render)(request, **kwargs)
+
+
+class AsyncBookListView(AsyncReadView):
+    viewset = BookApiView
+
+
+class AsyncBookDetailView(AsyncReadView):
+    viewset = BookApiView
+    actions = {'get': 'retrieve'}
+    book_kwarg = 'pk'
+
+
+class AsyncBookReviewListView(AsyncReadView):
+    viewset = BookApiView
+    actions = {'get': 'review_manage'}
+    initkwargs = BookApiView.review_manage.kwargs
+    book_kwarg = 'pk'
+
+
+class AsyncPublisherListView(AsyncReadView):
+    viewset = PublisherApiView
+    cached = False
@@ -0,0 +1,176 @@
+"""Batched write paths for the book API."""
+
+from django.db import transaction
+from django.db.models.functions import Now
+from rest_framework import serializers
+
+from book.cache import invalidate_books
+from book.serializers import DUPLICATE_ISBN, BookReviewSerializer, BookSerializer
+from core.db import copy_rows
+from core.models import Book, Publisher, Review
+
+
+def _publisher_key(publisher):
+    return (publisher['name'], publisher['website'], publisher['email'])
+
+
+def bulk_create_books(user, items):
+    """Validate and insert many books for `user` in one transaction.
+
+    Every item is validated with `BookSerializer`; invalid items are
+    reported and skipped without aborting the rest of the batch. Returns
+    one result dict per item, in input order.
+    """
+    # One serializer validates every item, so its fields are built once
+    # per batch instead of once per item, as `ListSerializer` does.
+    serializer = BookSerializer()
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, serializer.run_validation(item)))
+            results.append(None)
+        except serializers.ValidationError as exc:
+            results.append({'index': index, 'status': 'error', 'errors': exc.detail})
+
+    # ISBNs repeated within the batch are rejected here; ones the user
+    # already has, including books created concurrently, are skipped by
+    # the insert.
+    seen = set()
+    unique = []
+    for index, data in valid:
+        if data['isbn'] in seen:
+            results[index] = {'index': index, 'status': 'error', 'errors': {'isbn': [DUPLICATE_ISBN]}}
+        else:
+            seen.add(data['isbn'])
+            unique.append((index, data))
+    valid = unique
+
+    if not valid:
+        return results
+
+    with transaction.atomic():
+        inserted = Book.objects.insert_new(
+            user, ((data['title'], data['publication_date'], data['isbn']) for _, data in valid)
+        )
+        created = []
+        for index, data in valid:
+            if data['isbn'] in inserted:
+                created.append((index, data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'isbn': [DUPLICATE_ISBN]}}
+        if not created:
+            return results
+
+        publishers = Publisher.objects.get_or_create_many(
+            user,
+            [publisher for _, data in created for publisher in data.get('publishers', [])]
+        )
+        copy_rows(Book.publishers.through, ('book_id', 'publisher_id'), (
+            (inserted[data['isbn']], publisher_id)
+            for _, data in created
+            for publisher_id in {publishers[_publisher_key(p)].id for p in data.get('publishers', [])}
+        ))
+        Book.objects.filter(pk__in=inserted.values()).update_search_vector()
+        invalidate_books()
+
+    for index, data in created:
+        results[index] = {'index': index, 'status': 'created', 'id': inserted[data['isbn']]}
+
+    return results
+
+
+def bulk_create_reviews(user, items):
+    """Validate and insert many reviews by `user` in one transaction.
+
+    Items are reviews with the id of their `book` and may target any
+    number of books. Invalid items and unknown books are reported and
+    skipped. Reviews, their book links, review stats and search vectors
+    are written with one statement each. Returns one result dict per
+    item, in input order.
+    """
+    serializer = BookReviewSerializer()
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, serializer.run_validation(item)))
+            results.append(None)
+        except serializers.ValidationError as exc:
+            results.append({'index': index, 'status': 'error', 'errors': exc.detail})
+
+    if not valid:
+        return results
+
+    with transaction.atomic():
+        # Lock the books so one deleted concurrently cannot break the
+        # review links; their stats are updated below anyway.
+        existing = set(
+            Book.objects.filter(pk__in={data['book'] for _, data in valid})
+            .order_by('pk').select_for_update(no_key=True).values_list('id', flat=True)
+        )
+        found = []
+        for index, data in valid:
+            if data['book'] in existing:
+                found.append((index, data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'book': ['Book not found.']}}
+        valid = found
+        if not valid:
+            return results
+
+        stats = {}
+        texts = {}
+        for _, data in valid:
+            count, rating_sum = stats.get(data['book'], (0, 0))
+            stats[data['book']] = (count + 1, rating_sum + data['rating'])
+            texts[data['book']] = ' '.join(filter(None, [texts.get(data['book']), data['title'], data['content']]))
+
+        reviews = Review.objects.bulk_create(
+            Review(
+                user=user,
+                **{key: value for key, value in data.items() if key != 'book'}
+            ) for _, data in valid
+        )
+        copy_rows(Book.reviews.through, ('book_id', 'review_id'), (
+            (data['book'], review.id) for review, (_, data) in zip(reviews, valid)
+        ))
+        Book.objects.add_review_stats(stats)
+        Book.objects.append_review_search_texts(texts)
+        invalidate_books(stats)
+
+    for review, (index, _) in zip(reviews, valid):
+        results[index] = {'index': index, 'status': 'created', 'id': review.id}
+
+    return results
+
+
+def upsert_book(user, data):
+    """Create or update `user`'s book with the ISBN in validated `data`.
+
+    The book row is written with a single `INSERT ... ON CONFLICT`, so a
+    retried request neither duplicates the book nor rewrites it when
+    nothing changed. Returns the book and `created`, `updated` or
+    `unchanged`.
+    """
+    with transaction.atomic():
+        book_id, state = Book.objects.upsert(user, data['title'], data['publication_date'], data['isbn'])
+        books = Book.objects.filter(pk=book_id)
+
+        if 'publishers' in data:
+            publishers = Publisher.objects.get_or_create_many(user, data['publishers'])
+            publisher_ids = {publisher.id for publisher in publishers.values()}
+            book = Book(pk=book_id)
+            if state == 'created' or set(book.publishers.values_list('id', flat=True)) != publisher_ids:
+                book.publishers.set(publisher_ids)
+                if state == 'unchanged':
+                    # Publishers take part in the book's validators.
+                    books.update(updated_at=Now())
+                    state = 'updated'
+
+        if state == 'updated':
+            books.update_search_vector()
+        if state != 'unchanged':
+            invalidate_books([book_id])
+
+    return books.prefetch_related('publishers').get(), state
@@ -0,0 +1,181 @@
+"""Versioned response cache for the read-only book endpoints.
+
+Cached payloads are keyed by the full request URL and by a version token:
+the collection token for list pages and a per-book token for detail and
+review listings. Writes replace the tokens instead of deleting entries, so
+stale payloads simply stop being addressed and expire on their own.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from core import metrics
+
+COLLECTION_VERSION_KEY = 'book:version:collection'
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+stats = {'hits': 0, 'misses': 0}
+
+
+def _cache():
+    return caches[settings.BOOK_CACHE_ALIAS]
+
+
+def _book_version_key(book_id):
+    return f'book:version:book:{book_id}'
+
+
+def _version(key):
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+async def _aversion(key):
+    cache = _cache()
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        version = await cache.aget(key)
+
+    return version
+
+
+def _bump(keys):
+    _cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
+def invalidate_books(book_ids=()):
+    """Invalidate the collection and the given books.
+
+    Tokens are replaced right away and again on commit, so a reader that
+    repopulated the cache before the transaction committed is evicted too.
+    """
+    keys = [COLLECTION_VERSION_KEY] + [_book_version_key(book_id) for book_id in book_ids]
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _response_key(request, version):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+    return f'book:response:{version}:{url}'
+
+
+def _version_key(book_id):
+    if book_id is None:
+        return COLLECTION_VERSION_KEY
+
+    # URL kwargs are raw strings, `/books/01/` must share book 1's version
+    # or `invalidate_books` never reaches it. Non-numeric ids 404 and are
+    # never cached.
+    try:
+        book_id = int(book_id)
+    except (TypeError, ValueError):
+        pass
+
+    return _book_version_key(book_id)
+
+
+def _hit_response(request, cached, response_class):
+    stats['hits'] += 1
+    metrics.cache_lookup('book_response', hit=True)
+    data, headers = cached
+    response = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified'))
+    ) or response_class(data)
+    for header, value in headers.items():
+        response[header] = value
+    response['X-Cache'] = 'HIT'
+
+    return response
+
+
+def _miss(response):
+    stats['misses'] += 1
+    metrics.cache_lookup('book_response', hit=False)
+    response['X-Cache'] = 'MISS'
+    if response.status_code != 200:
+        return None
+
+    return response.data, {header: response[header] for header in VALIDATOR_HEADERS if response.has_header(header)}
+
+
+def cached_response(request, render, book_id=None):
+    """Serve `render()`'s payload from the cache when it is still current."""
+    timeout = settings.BOOK_CACHE_TIMEOUT
+    if not timeout:
+        return render()
+
+    key = _response_key(request, _version(_version_key(book_id)))
+    cache = _cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return _hit_response(request, cached, Response)
+
+    response = render()
+    entry = _miss(response)
+    if entry is not None:
+        cache.set(key, entry, timeout)
+
+    return response
+
+
+async def acached_response(request, render, book_id=None):
+    """`cached_response` for async views; `render` is a coroutine function."""
+    timeout = settings.BOOK_CACHE_TIMEOUT
+    if not timeout:
+        return await render()
+
+    key = _response_key(request, await _aversion(_version_key(book_id)))
+    cache = _cache()
+    cached = await cache.aget(key)
+    if cached is not None:
+        return _hit_response(request, cached, Response)
+
+    response = await render()
+    entry = _miss(response)
+    if entry is not None:
+        await cache.aset(key, entry, timeout)
+
+    return response
+
+
+async def acached_hit(request, response_class, book_id=None):
+    """Async cache lookup; returns the cached response or None on a miss.
+
+    Misses are not counted here, the render path that fills the cache
+    records them.
+    """
+    if not settings.BOOK_CACHE_TIMEOUT:
+        return None
+
+    cache = _cache()
+    version = await cache.aget(_version_key(book_id))
+    if version is None:
+        return None
+
+    cached = await cache.aget(_response_key(request, version))
+    if cached is None:
+        return None
+
+    return _hit_response(request, cached, response_class)
+
+
+def cache_stats():
+    total = stats['hits'] + stats['misses']
+
+    return {**stats, 'hit_ratio': stats['hits'] / total if total else 0.0}
@@ -0,0 +1,42 @@
+from rest_framework import filters, serializers
+
+
+class QueryParamFilterBackend(filters.BaseFilterBackend):
+    """Filter a queryset from the view's `query_filters` mapping.
+
+    `query_filters` maps a query parameter to an ORM lookup and the
+    serializer field used to validate its value, for example
+    `{'isbn': ('isbn', serializers.CharField())}`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        lookups = {}
+        errors = {}
+        for param, (lookup, field) in getattr(view, 'query_filters', {}).items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                lookups[lookup] = field.run_validation(value)
+            except serializers.ValidationError as exc:
+                errors[param] = exc.detail
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return queryset.filter(**lookups)
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """Ordering filter that always breaks ties on the primary key.
+
+    The tie-breaker follows the direction of the first ordering field so
+    composite `(field, id)` indexes can serve the whole ordering.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        if ordering and not {'id', '-id'} & set(ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+
+        return ordering
@@ -0,0 +1,126 @@
+"""Catalogue file ingestion.
+
+Supplier files are read as a stream of rows and loaded in batches through
+`bulk_create_books`, so rows are validated with `BookSerializer`,
+publishers are deduplicated like `_get_or_create_publisher` does and each
+batch is inserted with bulk inserts and COPY in its own transaction.
+
+CSV files have the columns `title`, `publication_date`, `isbn`,
+`publisher_name`, `publisher_website` and `publisher_email`; several
+publishers are separated with `|` in each publisher column. JSON Lines
+files hold one book per line in the API's payload format.
+"""
+
+import csv
+import json
+import time
+from itertools import islice
+
+from book.bulk import bulk_create_books
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+PUBLISHER_SEPARATOR = '|'
+
+
+def detect_format(filename):
+    for extension, file_format in FORMATS.items():
+        if filename.lower().endswith(extension):
+            return file_format
+
+    raise ValueError(f'Cannot tell the format of {filename!r}, expected one of {", ".join(FORMATS)}.')
+
+
+def _csv_item(row):
+    columns = [(row.get(f'publisher_{field}') or '').split(PUBLISHER_SEPARATOR) for field in ('name', 'website', 'email')]
+    publishers = [
+        {'name': name.strip(), 'website': website.strip(), 'email': email.strip()}
+        for name, website, email in zip(*columns) if name.strip()
+    ]
+
+    return {
+        'title': row.get('title'),
+        'publication_date': row.get('publication_date'),
+        'isbn': row.get('isbn'),
+        'publishers': publishers,
+    }
+
+
+def read_rows(stream, file_format):
+    """Yield `(row_number, item, error)` for every record of a text stream."""
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, _csv_item(row), None
+    elif file_format == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield number, None, {'non_field_errors': ['Invalid JSON.']}
+                continue
+            if not isinstance(item, dict):
+                yield number, None, {'non_field_errors': ['Expected a JSON object.']}
+                continue
+            yield number, item, None
+    else:
+        raise ValueError(f'Unsupported format {file_format!r}.')
+
+
+class ImportReport:
+    def __init__(self, max_errors=100):
+        self.rows = 0
+        self.created = 0
+        self.rejected = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.started = time.perf_counter()
+
+    def reject(self, row, errors):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'errors': errors})
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'rejected': self.rejected,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows / self.elapsed, 1) if self.elapsed else 0.0,
+            'errors': self.errors,
+        }
+
+
+def import_catalogue(user, rows, batch_size=1000, max_errors=100, progress=None):
+    """Load `rows` from `read_rows` for `user`, one transaction per batch."""
+    report = ImportReport(max_errors=max_errors)
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        report.rows += len(batch)
+
+        items = []
+        for number, item, error in batch:
+            if error is not None:
+                report.reject(number, error)
+            else:
+                items.append((number, item))
+
+        results = bulk_create_books(user, [item for _, item in items])
+        for (number, _), result in zip(items, results):
+            if result['status'] == 'created':
+                report.created += 1
+            else:
+                report.reject(number, result['errors'])
+
+        if progress is not None:
+            progress(report)
+
+    return report
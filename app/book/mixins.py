@@ -0,0 +1,138 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import serializers
+
+
+class ConditionalGetMixin:
+    """Answer If-None-Match / If-Modified-Since before serializing.
+
+    Validators are built from `updated_at` of the rows the response would
+    contain, and of the `modified_relations` embedded in those rows, using
+    one light query instead of the full prefetch and serialization.
+
+    Only details get a Last-Modified. Deleting a book, or rows moving into
+    a page, does not advance the newest `updated_at` of a collection, so
+    lists are validated by the ETag alone, which hashes the ids too.
+    """
+    modified_relations = []
+
+    def _validator_queryset(self):
+        annotations = {
+            f'{relation}_modified': Max(f'{relation}__updated_at') for relation in self.modified_relations
+        }
+        fields = {'id', 'updated_at'} | {field.lstrip('-') for field in getattr(self, 'ordering_fields', [])}
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        return queryset.values(*fields).annotate(**annotations)
+
+    def _page_state(self):
+        paginator = self.paginator
+        return getattr(paginator, 'has_next', None), getattr(paginator, 'has_previous', None)
+
+    def _validator_rows(self, request, pk=None):
+        queryset = self._validator_queryset()
+        if pk is not None:
+            return list(queryset.filter(pk=pk)), ()
+
+        if self.paginator is None:
+            return list(queryset), ()
+
+        return self.paginator.paginate_queryset(queryset, request, view=self), self._page_state()
+
+    async def _avalidator_rows(self, request, pk=None):
+        queryset = self._validator_queryset()
+        if pk is not None:
+            return [row async for row in queryset.filter(pk=pk).aiterator()], ()
+
+        if self.paginator is None:
+            return [row async for row in queryset.aiterator()], ()
+
+        return await self.paginator.apaginate_queryset(queryset, request, view=self), self._page_state()
+
+    def _validators(self, rows, page_state, detail):
+        keys = ['updated_at'] + [f'{relation}_modified' for relation in self.modified_relations]
+        stamps = [[row['id']] + [row[key] for key in keys] for row in rows]
+        modified = [stamp for row in stamps for stamp in row[1:] if stamp is not None]
+        last_modified = int(max(modified).timestamp()) if detail and modified else None
+        etag = '"%s"' % hashlib.md5(repr((stamps, page_state)).encode()).hexdigest()
+
+        return etag, last_modified
+
+    @staticmethod
+    def _set_validators(response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+    def conditional_response(self, request, render, pk=None):
+        try:
+            rows, page_state = self._validator_rows(request, pk=pk)
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookups are reported by the regular code path.
+            return render()
+        if pk is not None and not rows:
+            return render()
+
+        etag, last_modified = self._validators(rows, page_state, detail=pk is not None)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+        return self._set_validators(response or render(), etag, last_modified)
+
+    async def aconditional_response(self, request, render, pk=None):
+        """`conditional_response` for async views; `render` is a coroutine function."""
+        try:
+            rows, page_state = await self._avalidator_rows(request, pk=pk)
+        except (TypeError, ValueError, ValidationError):
+            return await render()
+        if pk is not None and not rows:
+            return await render()
+
+        etag, last_modified = self._validators(rows, page_state, detail=pk is not None)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+        return self._set_validators(response or await render(), etag, last_modified)
+
+
+class SparseFieldsetMixin:
+    """`?fields=` and `?expand=` parameters for read actions.
+
+    `fields` lists the fields to return and `expand` the nested relations
+    (from `expandable_fields`) to embed. Without either parameter every
+    field and relation is returned; with only `expand`, every plain field
+    is kept.
+    """
+    expandable_fields = []
+
+    def requested_fields(self, serializer_class):
+        """The field names to render as a frozenset, or None for all of them."""
+        if getattr(self, 'request', None) is None:
+            return None
+
+        params = self.request.query_params
+        fields, expand = (
+            [name for name in params[param].split(',') if name] if params.get(param) else None
+            for param in ('fields', 'expand')
+        )
+        if fields is None and expand is None:
+            return None
+
+        available = serializer_class.Meta.fields
+        errors = {}
+        unknown = sorted(set(fields or ()) - set(available))
+        if unknown:
+            errors['fields'] = [f'Unknown field(s): {", ".join(unknown)}.']
+        unknown = sorted(set(expand or ()) - set(self.expandable_fields))
+        if unknown:
+            errors['expand'] = [f'Unknown relation(s): {", ".join(unknown)}.']
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        if fields is None:
+            fields = [name for name in available if name not in self.expandable_fields]
+
+        return frozenset(fields) | frozenset(expand or ())
@@ -0,0 +1,128 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+def _reverse(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination over the full ordering, newest first by default.
+
+    DRF's cursor only stores the first ordering field and skips ties with
+    an OFFSET. Here the cursor stores the value of every ordering field of
+    the row it points at, and pages are fetched with
+    `WHERE field > v OR (field = v AND id > i)`. Orderings must end on a
+    unique, non-null field (`StableOrderingFilter` appends `id`), so large
+    tie groups cost the same as any other page and can be served from the
+    `(field, id)` indexes.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` through the async ORM."""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+
+        return self._set_page([row async for row in queryset.aiterator()])
+
+    def _page_queryset(self, queryset, request, view):
+        """The unevaluated query for the requested page plus one row."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        self._reverse = self.cursor is not None and self.cursor.reverse
+        self._position = None if self.cursor is None else self.cursor.position
+
+        ordering = _reverse(self.ordering) if self._reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self._position is not None:
+            queryset = queryset.filter(self._after(queryset.model, ordering, self._position))
+
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+
+        if self._reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_following
+        else:
+            self.has_next, self.has_previous = has_following, self._position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _after(self, model, ordering, position):
+        """Rows strictly after `position` in `ordering`."""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError(position)
+            names = [field.lstrip('-') for field in ordering]
+            # Cursors come from the client, so every value is checked
+            # against its field before it reaches the query.
+            values = [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+            if None in values:
+                raise ValueError(position)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for field, name, value in zip(ordering, names, values):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [
+            instance[field.lstrip('-')] if isinstance(instance, dict) else getattr(instance, field.lstrip('-'))
+            for field in ordering
+        ]
+        return json.dumps(values, default=str)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        # An empty page before the cursor means the first page comes next.
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class RankedPagination(PageNumberPagination):
+    """Page number pagination for results ordered by a computed rank."""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,9 +1,28 @@
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField
 from rest_framework import serializers
 
+from book.cache import invalidate_books
+from core.isbn import normalize_isbn
 from core.models import Book, Publisher, Review
+from core.profiling import TimedRepresentationMixin
 
 
-class PublisherSerializer(serializers.ModelSerializer):
+DUPLICATE_ISBN = 'You already have a book with this ISBN.'
+
+
+class IsbnField(serializers.CharField):
+    """CharField that stores ISBNs in their canonical form."""
+
+    def to_internal_value(self, data):
+        value = normalize_isbn(super().to_internal_value(data))
+        if not value:
+            self.fail('blank')
+
+        return value
+
+
+class PublisherSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Publisher
         fields = ['id', 'name', 'website', 'email']
@@ -21,34 +40,47 @@ class PublisherSerializer(serializers.ModelSerializer):
         return publisher
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ['id', 'title', 'content', 'rating']
         read_only_fields = ['id']
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookReviewSerializer(ReviewSerializer):
+    """A review together with the id of the book it belongs to."""
+    book = serializers.IntegerField(write_only=True, min_value=1, max_value=BigIntegerField.MAX_BIGINT)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ['book']
+
+
+class BookSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    isbn = IsbnField(max_length=255)
     publishers = PublisherSerializer(many=True, required=False)
 
     class Meta:
         model = Book
-        fields = ['id', 'title', 'publication_date', 'isbn', 'publishers']
-        read_only_fields = ['id']
+        fields = ['id', 'title', 'publication_date', 'isbn', 'publishers', 'review_count', 'rating_avg']
+        read_only_fields = ['id', 'review_count', 'rating_avg']
 
     def _get_or_create_publisher(self, book, publishers):
 
         user = self.context.get('request').user
-        for publisher in publishers:
-            publisher_obj, created = \
-                Publisher.objects.get_or_create(user=user, **publisher)
-            book.publishers.add(publisher_obj)
+        publisher_objs = Publisher.objects.get_or_create_many(user, publishers)
+        book.publishers.add(*publisher_objs.values())
 
     def create(self, validated_data):
 
         publishers = validated_data.pop('publishers', [])
-        book = Book.objects.create(**validated_data)
+        try:
+            with transaction.atomic():
+                book = Book.objects.create(**validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({'isbn': [DUPLICATE_ISBN]})
         self._get_or_create_publisher(book, publishers)
+        Book.objects.filter(pk=book.pk).update_search_vector()
+        invalidate_books()
 
         return book
 
@@ -56,19 +88,44 @@ class BookSerializer(serializers.ModelSerializer):
 
         publishers = validated_data.pop('publishers', None)
 
-        if publishers is not None:
-            instance.publishers.clear()
-            self._get_or_create_publisher(instance, publishers)
-
         for key, value in validated_data.items():
             setattr(instance, key, value)
 
-        instance.save()
+        # Publisher changes roll back with the save when the ISBN clashes.
+        try:
+            with transaction.atomic():
+                if publishers is not None:
+                    instance.publishers.clear()
+                    self._get_or_create_publisher(instance, publishers)
+                instance.save()
+                if 'title' in validated_data:
+                    Book.objects.filter(pk=instance.pk).update_search_vector()
+                invalidate_books([instance.pk])
+        except IntegrityError:
+            raise serializers.ValidationError({'isbn': [DUPLICATE_ISBN]})
+
         return instance
 
 
-class BookSerializerOnlyView(BookSerializer):
-    reviews = ReviewSerializer(many=True, required=False)
+class SparseFieldsMixin:
+    """Accept a `fields` argument restricting the serialized fields."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class BookSerializerOnlyView(SparseFieldsMixin, BookSerializer):
+    reviews = ReviewSerializer(many=True, read_only=True, source='embedded_reviews')
 
     class Meta(BookSerializer.Meta):
         fields = BookSerializer.Meta.fields + ['reviews']
+
+
+class BookSearchSerializer(BookSerializerOnlyView):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(BookSerializerOnlyView.Meta):
+        fields = BookSerializerOnlyView.Meta.fields + ['rank']
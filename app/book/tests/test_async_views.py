@@ -0,0 +1,210 @@
+"""Tests for the async read endpoints served under ASGI."""
+
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from book.async_views import AsyncReadView
+from book.views import BookApiView
+from core.models import Book, Publisher, Review
+from user.authentication import token_cache
+
+
+BOOK_URL = reverse('book:book-list')
+ASYNC_BOOK_URL = reverse('book-async:book-list')
+ASYNC_PUBLISHER_URL = reverse('book-async:publisher-list')
+
+
+def detail_url(book_id):
+    return reverse('book:book-detail', args=[book_id])
+
+
+def async_detail_url(book_id):
+    return reverse('book-async:book-detail', args=[book_id])
+
+
+def async_review_manage_url(book_id):
+    return reverse('book-async:book-review-manage', args=[book_id])
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def book_create(user, **params):
+    defaults = {
+        'title': 'Book Title',
+        'publication_date': '2023-01-01',
+        'isbn': '123456789',
+    }
+    defaults.update(params)
+
+    return Book.objects.create(user=user, **defaults)
+
+
+class AsyncBookApiTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        token_cache.clear()
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    async def _async_get(self, url, headers):
+        return await self.async_client.get(url, headers={**self.headers, **headers})
+
+    def async_client_get(self, url, headers=None):
+        return async_to_sync(self._async_get)(url, headers or {})
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(ASYNC_BOOK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    async def test_invalid_token_rejected(self):
+        res = await self.async_client.get(ASYNC_BOOK_URL, headers={'Authorization': 'Token invalid'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_endpoint(self):
+        book = book_create(user=self.user)
+        review = Review.objects.create(user=self.user, title='Review', content='Content', rating=4)
+        book.reviews.add(review)
+
+        res = self.async_client_get(ASYNC_BOOK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(json.loads(res.content), json.loads(self.client.get(BOOK_URL).content))
+
+    @override_settings(BOOK_CACHE_TIMEOUT=0)
+    @mock.patch.object(AsyncReadView, '_render', side_effect=AssertionError('sync fallback used'))
+    def test_list_and_retrieve_use_async_orm(self, _render):
+        publisher = Publisher.objects.create(user=self.user, name='Acme', website='https://acme.com', email='a@acme.com')
+        books = [book_create(user=self.user, title=f'Book {i % 2}', isbn=str(i)) for i in range(5)]
+        books[0].publishers.add(publisher)
+        books[1].reviews.add(Review.objects.create(user=self.user, title='Review', content='Content', rating=4))
+
+        for params in ['', '?ordering=title&page_size=2', '?fields=id,title&expand=publishers', '?min_reviews=1']:
+            sync_pages, async_pages = [], []
+            for pages, url, get in [
+                (sync_pages, BOOK_URL + params, lambda url, headers: self.client.get(url, **headers)),
+                (async_pages, ASYNC_BOOK_URL + params, self.async_client_get),
+            ]:
+                while url:
+                    res = get(url, {})
+                    self.assertEqual(res.status_code, status.HTTP_200_OK)
+                    pages.append((json.loads(res.content)['results'], res['ETag']))
+                    url = json.loads(res.content)['next']
+
+            self.assertEqual(async_pages, sync_pages, params)
+
+        res = self.async_client_get(async_detail_url(books[0].id))
+        self.assertEqual(json.loads(res.content), json.loads(self.client.get(detail_url(books[0].id)).content))
+
+        res = self.async_client_get(async_detail_url(books[0].id), {'If-None-Match': res['ETag']})
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_invalid_parameters(self):
+        res = self.async_client_get(ASYNC_BOOK_URL + '?published_after=yesterday')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('published_after', json.loads(res.content))
+
+        res = self.async_client_get(ASYNC_BOOK_URL + '?cursor=not-a-cursor')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_runs_viewset_initial(self):
+        res = self.async_client_get(ASYNC_BOOK_URL, {'Accept': 'application/xml'})
+        self.assertEqual(res.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+        class DenyThrottle:
+            def allow_request(self, request, view):
+                return False
+
+            def wait(self):
+                return 30
+
+        with mock.patch.object(BookApiView, 'throttle_classes', [DenyThrottle]):
+            res = self.async_client_get(ASYNC_BOOK_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '30')
+
+    def test_list_served_from_cache(self):
+        book_create(user=self.user)
+        first = self.async_client_get(ASYNC_BOOK_URL)
+
+        res = self.async_client_get(ASYNC_BOOK_URL)
+
+        self.assertEqual(res['X-Cache'], 'HIT')
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(res.content, first.content)
+
+    def test_cached_conditional_get(self):
+        book_create(user=self.user)
+        etag = self.async_client_get(ASYNC_BOOK_URL)['ETag']
+
+        res = self.async_client_get(ASYNC_BOOK_URL, {'If-None-Match': etag})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['X-Cache'], 'HIT')
+
+    def test_retrieve_reflects_updates(self):
+        book = book_create(user=self.user)
+        self.async_client_get(async_detail_url(book.id))
+
+        self.client.patch(detail_url(book.id), {'title': 'Updated'}, format='json')
+        res = self.async_client_get(async_detail_url(book.id))
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(json.loads(res.content)['title'], 'Updated')
+
+    def test_retrieve_missing_book(self):
+        res = self.async_client_get(async_detail_url(0))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_review_listing(self):
+        book = book_create(user=self.user)
+        review = Review.objects.create(user=self.user, title='Review', content='Content', rating=4)
+        book.reviews.add(review)
+
+        res = self.async_client_get(async_review_manage_url(book.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in json.loads(res.content)['results']], [review.id])
+
+    def test_publisher_list_limited_to_user(self):
+        other = create_user(email='other@example.com')
+        Publisher.objects.create(user=other, name='Other', website='https://other.com', email='o@example.com')
+        publisher = Publisher.objects.create(
+            user=self.user, name='Mine', website='https://mine.com', email='m@example.com'
+        )
+
+        res = self.async_client_get(ASYNC_PUBLISHER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in json.loads(res.content)['results']], [publisher.id])
+
+    async def test_token_cache_miss_uses_async_orm(self):
+        res = await self.async_client.get(ASYNC_PUBLISHER_URL, headers=self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(token_cache.get(self.token.key))
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 from book.serializers import (
+    DUPLICATE_ISBN,
     PublisherSerializer,
     BookSerializerOnlyView
 )
@@ -13,14 +15,21 @@ from core.models import (
     Review
 )
 
+import base64
+import itertools
+import json
 import pendulum
+from urllib.parse import urlencode
+
+
+ISBNS = itertools.count(1)
 
 
 def book_create(user, **params):
     defaults = {
         'title': 'Book Title',
         'publication_date': '2023-01-01',
-        'isbn': '123456789',
+        'isbn': f'{next(ISBNS):09d}',
     }
     defaults.update(params)
 
@@ -50,6 +59,10 @@ def create_review(user, **params):
 
 
 BOOK_URL = reverse('book:book-list')
+EXPORT_URL = reverse('book:book-export')
+BULK_URL = reverse('book:book-bulk-create')
+UPSERT_URL = reverse('book:book-upsert')
+BULK_REVIEWS_URL = reverse('book:book-bulk-reviews')
 
 
 def review_detail_url(book_id):
@@ -63,6 +76,7 @@ def detail_url(book_id):
 class PublicBookApiTest(TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
+        cache.clear()
 
     def test_book_list_unauthenticated(self):
         res = self.client.get(BOOK_URL)
@@ -83,6 +97,7 @@ class PublicBookApiTest(TestCase):
 class PrivateBookApiTest(TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
+        cache.clear()
         self.user = get_user_model().objects.create_user(
             email='test@example.com',
             name='Test User',
@@ -106,7 +121,129 @@ class PrivateBookApiTest(TestCase):
         books = Book.objects.all().order_by('-id')
         serializer = BookSerializerOnlyView(books, many=True)
 
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data['results'])
+
+    def test_books_paginated_with_cursor(self):
+        books = [book_create(user=self.user, title=f'Book{i}') for i in range(5)]
+
+        res = self.client.get(BOOK_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([b['id'] for b in res.data['results']], [books[4].id, books[3].id])
+        self.assertIsNone(res.data['previous'])
+
+        seen = []
+        url = BOOK_URL + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            seen.extend(b['id'] for b in res.data['results'])
+            url = res.data['next']
+
+        self.assertEqual(seen, [b.id for b in reversed(books)])
+
+    def test_books_invalid_cursor(self):
+        res = self.client.get(BOOK_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        book_create(user=self.user)
+        cases = [
+            ({}, ['x']),
+            ({}, [None]),
+            ({}, [{'id': 1}]),
+            ({'ordering': 'publication_date'}, ['not-a-date', 1]),
+        ]
+        for params, position in cases:
+            cursor = base64.b64encode(urlencode({'p': json.dumps(position)}).encode()).decode()
+            with self.subTest(params=params, position=position):
+                res = self.client.get(BOOK_URL, {**params, 'cursor': cursor})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_books(self):
+        publisher = create_publisher(user=self.user)
+        other_user = create_user(email='other@example.com')
+        b1 = book_create(user=self.user, title='Django for APIs', isbn='111', publication_date='2021-05-01')
+        b2 = book_create(user=self.user, title='Dune', isbn='222', publication_date='1965-08-01')
+        b3 = book_create(user=other_user, title='Python Tricks', isbn='333', publication_date='2017-10-25')
+        b2.publishers.add(publisher)
+
+        cases = [
+            ({'isbn': '111'}, [b1]),
+            ({'title': 'du'}, [b2]),
+            ({'title': 'D'}, [b2, b1]),
+            ({'published_after': '2000-01-01'}, [b3, b1]),
+            ({'published_after': '2000-01-01', 'published_before': '2020-01-01'}, [b3]),
+            ({'publisher': publisher.id}, [b2]),
+            ({'user': other_user.id}, [b3]),
+        ]
+        for params, expected in cases:
+            res = self.client.get(BOOK_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual([b['id'] for b in res.data['results']], [b.id for b in expected], params)
+
+    def test_filter_books_invalid_value(self):
+        res = self.client.get(BOOK_URL, {'published_after': 'yesterday'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('published_after', res.data)
+
+    def test_order_books(self):
+        b1 = book_create(user=self.user, title='B', publication_date='2020-01-01')
+        b2 = book_create(user=self.user, title='A', publication_date='2021-01-01')
+        b3 = book_create(user=self.user, title='B', publication_date='2019-01-01')
+
+        res = self.client.get(BOOK_URL, {'ordering': 'title'})
+        self.assertEqual([b['id'] for b in res.data['results']], [b2.id, b1.id, b3.id])
+
+        res = self.client.get(BOOK_URL, {'ordering': '-publication_date', 'page_size': 2})
+        self.assertEqual([b['id'] for b in res.data['results']], [b2.id, b1.id])
+        res = self.client.get(res.data['next'])
+        self.assertEqual([b['id'] for b in res.data['results']], [b3.id])
+
+    def test_order_books_pages_through_ties(self):
+        Book.objects.bulk_create(
+            Book(user=self.user, title='Same', publication_date='2023-01-01', isbn=f'{next(ISBNS):09d}')
+            for _ in range(1050)
+        )
+        ids = list(Book.objects.order_by('id').values_list('id', flat=True))
+
+        for ordering, expected in [('title', ids), ('-rating_avg', ids[::-1])]:
+            seen = []
+            url = f'{BOOK_URL}?ordering={ordering}&page_size=100'
+            while url:
+                res = self.client.get(url)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                seen.extend(b['id'] for b in res.data['results'])
+                previous, url = res.data['previous'], res.data['next']
+
+            self.assertEqual(seen, expected, ordering)
+
+            res = self.client.get(previous)
+            self.assertEqual([b['id'] for b in res.data['results']], expected[-150:-50])
+
+    def test_order_books_unknown_field_ignored(self):
+        b1 = book_create(user=self.user)
+        b2 = book_create(user=self.user)
+
+        res = self.client.get(BOOK_URL, {'ordering': 'user__password'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([b['id'] for b in res.data['results']], [b2.id, b1.id])
+
+    def test_export_books(self):
+        book_create(user=self.user, title='Book1')
+        book_create(user=self.user, title='Book2')
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(res.streaming_content).splitlines()
+        books = Book.objects.all().order_by('-id')
+        serializer = BookSerializerOnlyView(books, many=True)
+        self.assertEqual([json.loads(line) for line in lines], serializer.data)
 
     def test_books_patch_not_allowed(self):
         """Testing that books not accept partial updates."""
@@ -237,6 +374,7 @@ def detail_publisher_url(publisher_id):
 class PublisherApiView(TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
+        cache.clear()
         self.user = create_user()
         self.client.force_authenticate(user=self.user)
 
@@ -264,7 +402,7 @@ class PublisherApiView(TestCase):
         publishers = Publisher.objects.filter(user=self.user).order_by('-id')
         serializer = PublisherSerializer(publishers, many=True)
 
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data['results'])
 
     def test_retrieve_publishers_limited(self):
         other_user = create_user(
@@ -291,9 +429,9 @@ class PublisherApiView(TestCase):
         s2 = PublisherSerializer(p2)
         s3 = PublisherSerializer(p3)
 
-        self.assertNotIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertIn(s3.data, res.data)
+        self.assertNotIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertIn(s3.data, res.data['results'])
 
     def test_publisher_partial_update(self):
         origin_email = 'publisher@example.com'
@@ -379,6 +517,220 @@ class PublisherApiView(TestCase):
         self.assertEqual(book.publishers.count(), 1)
         self.assertIn(publisher, book.publishers.all())
 
+    def test_bulk_create_books_skips_taken_isbns(self):
+        book_create(user=self.user, isbn='333')
+        payload = [
+            {'title': 'Taken', 'publication_date': '2023-01-01', 'isbn': '333', 'publishers': [
+                {'name': 'Unused', 'website': 'https://unused.example.com', 'email': 'unused@example.com'}
+            ]},
+            {'title': 'New', 'publication_date': '2023-01-01', 'isbn': '444'},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['results'][0]['errors'], {'isbn': [DUPLICATE_ISBN]})
+        self.assertEqual(res.data['results'][1]['status'], 'created')
+        self.assertFalse(Publisher.objects.filter(name='Unused').exists())
+        self.assertEqual(Book.objects.get(user=self.user, isbn='333').title, 'Book Title')
+
+    def test_bulk_create_books(self):
+        existing = create_publisher(
+            user=self.user,
+            name='Existing',
+            website='https://existing.example.com',
+            email='existing@example.com'
+        )
+        shared = {
+            'name': 'Shared',
+            'website': 'https://shared.example.com',
+            'email': 'shared@example.com',
+        }
+        payload = [
+            {
+                'title': 'Book1',
+                'publication_date': '2023-01-01',
+                'isbn': '111',
+                'publishers': [shared, shared],
+            },
+            {
+                'title': 'Book2',
+                'publication_date': '2023-01-02',
+                'isbn': '222',
+                'publishers': [
+                    shared,
+                    {'name': 'Existing', 'website': 'https://existing.example.com', 'email': 'existing@example.com'}
+                ],
+            },
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(Publisher.objects.filter(user=self.user).count(), 2)
+        book1 = Book.objects.get(id=res.data['results'][0]['id'])
+        book2 = Book.objects.get(id=res.data['results'][1]['id'])
+        self.assertEqual(book1.user, self.user)
+        self.assertEqual([p.name for p in book1.publishers.all()], ['Shared'])
+        self.assertIn(existing, book2.publishers.all())
+        self.assertEqual(book2.publishers.count(), 2)
+
+    def test_bulk_create_reports_item_errors(self):
+        payload = [
+            {'title': 'Book1', 'publication_date': '2023-01-01', 'isbn': '111'},
+            {'title': 'Book2', 'publication_date': 'not a date', 'isbn': '222'},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['results'][0]['status'], 'created')
+        self.assertEqual(res.data['results'][1]['status'], 'error')
+        self.assertIn('publication_date', res.data['results'][1]['errors'])
+        self.assertTrue(Book.objects.filter(title='Book1').exists())
+        self.assertFalse(Book.objects.filter(title='Book2').exists())
+
+    def test_bulk_create_rejects_duplicate_isbns(self):
+        book_create(user=self.user, isbn='9780306406157')
+        payload = [
+            {'title': 'Book1', 'publication_date': '2023-01-01', 'isbn': '0-306-40615-2'},
+            {'title': 'Book2', 'publication_date': '2023-01-01', 'isbn': '222'},
+            {'title': 'Book3', 'publication_date': '2023-01-01', 'isbn': '222'},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in res.data['results']], ['error', 'created', 'error'])
+        self.assertIn('isbn', res.data['results'][0]['errors'])
+        self.assertEqual(Book.objects.filter(user=self.user).count(), 2)
+
+    def test_create_book_normalizes_isbn(self):
+        payload = {'title': 'Book', 'publication_date': '2023-01-01', 'isbn': '0-306-40615-2'}
+
+        res = self.client.post(BOOK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['isbn'], '9780306406157')
+
+    def test_create_book_duplicate_isbn_rejected(self):
+        book_create(user=self.user, isbn='9780306406157')
+        payload = {'title': 'Book', 'publication_date': '2023-01-01', 'isbn': '978-0-306-40615-7'}
+
+        res = self.client.post(BOOK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('isbn', res.data)
+
+    def test_update_book_duplicate_isbn_keeps_publishers(self):
+        book_create(user=self.user, isbn='9780306406157')
+        book = book_create(user=self.user)
+        publisher = create_publisher(user=self.user)
+        book.publishers.add(publisher)
+        payload = {
+            'title': 'Book',
+            'publication_date': '2023-01-01',
+            'isbn': '9780306406157',
+            'publishers': [{'name': 'Other', 'website': 'https://other.example.com', 'email': 'other@example.com'}],
+        }
+
+        res = self.client.put(detail_url(book.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('isbn', res.data)
+        self.assertEqual(list(book.publishers.all()), [publisher])
+        self.assertFalse(Publisher.objects.filter(name='Other').exists())
+
+    def test_same_isbn_for_other_user_allowed(self):
+        other_user = create_user(email='other@example.com')
+        book_create(user=other_user, isbn='9780306406157')
+        payload = {'title': 'Book', 'publication_date': '2023-01-01', 'isbn': '9780306406157'}
+
+        res = self.client.post(BOOK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_filter_by_isbn_normalized(self):
+        book = book_create(user=self.user, isbn='9780306406157')
+
+        res = self.client.get(BOOK_URL, {'isbn': '0-306-40615-2'})
+
+        self.assertEqual([b['id'] for b in res.data['results']], [book.id])
+
+    def test_upsert_creates_book(self):
+        payload = {
+            'title': 'Book',
+            'publication_date': '2023-01-01',
+            'isbn': '0-306-40615-2',
+            'publishers': [{'name': 'Acme', 'website': 'https://acme.com', 'email': 'a@acme.com'}],
+        }
+
+        res = self.client.put(UPSERT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['status'], 'created')
+        book = Book.objects.get(id=res.data['id'])
+        self.assertEqual(book.isbn, '9780306406157')
+        self.assertEqual(book.user, self.user)
+        self.assertEqual([p.name for p in book.publishers.all()], ['Acme'])
+        self.assertTrue(Book.objects.filter(search_vector='book').exists())
+
+    def test_upsert_updates_existing_book(self):
+        book = book_create(user=self.user, title='Old', isbn='9780306406157')
+        payload = {'title': 'New', 'publication_date': '2024-01-01', 'isbn': '0306406152'}
+
+        res = self.client.put(UPSERT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], 'updated')
+        self.assertEqual(res.data['id'], book.id)
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'New')
+        self.assertEqual(str(book.publication_date), '2024-01-01')
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_upsert_retry_leaves_book_untouched(self):
+        payload = {'title': 'Book', 'publication_date': '2023-01-01', 'isbn': '111'}
+        self.client.put(UPSERT_URL, payload, format='json')
+        updated_at = Book.objects.get().updated_at
+
+        res = self.client.put(UPSERT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], 'unchanged')
+        self.assertEqual(Book.objects.get().updated_at, updated_at)
+
+    def test_upsert_publisher_change_updates_book(self):
+        book = book_create(user=self.user, title='Book', isbn='111')
+        payload = {
+            'title': 'Book',
+            'publication_date': '2023-01-01',
+            'isbn': '111',
+            'publishers': [{'name': 'Acme', 'website': 'https://acme.com', 'email': 'a@acme.com'}],
+        }
+
+        res = self.client.put(UPSERT_URL, payload, format='json')
+
+        self.assertEqual(res.data['status'], 'updated')
+        self.assertEqual([p.name for p in book.publishers.all()], ['Acme'])
+
+    def test_upsert_invalid_payload(self):
+        res = self.client.put(UPSERT_URL, {'title': 'Book', 'isbn': '111'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('publication_date', res.data)
+        self.assertFalse(Book.objects.exists())
+
+    def test_bulk_create_requires_list(self):
+        payload = {'title': 'Book1', 'publication_date': '2023-01-01', 'isbn': '111'}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Book.objects.exists())
+
     def test_update_book_publishers_add_new_one(self):
         publisher_details = {
             'name': 'Publisher',
@@ -451,6 +803,20 @@ class PublisherApiView(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['id'], review.id)
+
+    def test_get_book_reviews_paginated(self):
+        book = book_create(user=self.user)
+        reviews = [create_review(user=self.user, title=f'Review{i}') for i in range(3)]
+        book.reviews.add(*reviews)
+        url = review_detail_url(book.id)
+
+        res = self.client.get(url, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in res.data['results']], [reviews[2].id, reviews[1].id])
+        res = self.client.get(res.data['next'])
+        self.assertEqual([r['id'] for r in res.data['results']], [reviews[0].id])
 
     def test_create_review(self):
         book = book_create(user=self.user)
@@ -468,6 +834,166 @@ class PublisherApiView(TestCase):
         review = reviews[0]
         self.assertIn(review, book.reviews.all())
 
+    def test_review_stats_maintained(self):
+        book = book_create(user=self.user)
+        url = review_detail_url(book.id)
+        for rating in (4, 9):
+            payload = {'title': 'Review', 'content': 'Content', 'rating': rating}
+            self.client.post(url, payload, format='json')
+
+        book.refresh_from_db()
+        self.assertEqual(book.review_count, 2)
+        self.assertEqual(book.rating_sum, 13)
+        self.assertEqual(book.rating_avg, 6.5)
+
+        review = book.reviews.get(rating=9)
+        self.client.delete(reverse('book:review-detail', args=(review.id,)))
+        book.refresh_from_db()
+        self.assertEqual(book.review_count, 1)
+        self.assertEqual(book.rating_avg, 4.0)
+
+        res = self.client.get(detail_url(book.id))
+        self.assertEqual(res.data['review_count'], 1)
+        self.assertEqual(res.data['rating_avg'], 4.0)
+
+    def test_review_delete_with_drifted_stats(self):
+        book = book_create(user=self.user)
+        review = create_review(user=self.user, rating=7)
+        book.reviews.add(review)
+
+        res = self.client.delete(reverse('book:review-detail', args=(review.id,)))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        book.refresh_from_db()
+        self.assertEqual((book.review_count, book.rating_sum, book.rating_avg), (0, 0, 0))
+
+    def test_create_review_invalid(self):
+        book = book_create(user=self.user)
+        payload = {'title': 'Review', 'content': 'Content'}
+
+        res = self.client.post(review_detail_url(book.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rating', res.data)
+        self.assertFalse(Review.objects.exists())
+
+    def test_bulk_create_reviews(self):
+        book = book_create(user=self.user, title='Dune')
+        other = book_create(user=create_user(email='other@example.com'))
+        payload = [
+            {'book': book.id, 'title': 'Great', 'content': 'Sandworms everywhere', 'rating': 9},
+            {'book': other.id, 'title': 'Fine', 'content': 'Content', 'rating': 5},
+            {'book': book.id, 'title': 'Meh', 'content': 'Too long', 'rating': 4},
+        ]
+
+        with self.assertNumQueries(7):
+            res = self.client.post(BULK_REVIEWS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 3)
+        self.assertEqual(
+            [review.id for review in book.reviews.order_by('id')],
+            [res.data['results'][0]['id'], res.data['results'][2]['id']]
+        )
+        self.assertEqual(Review.objects.filter(user=self.user).count(), 3)
+        book.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((book.review_count, book.rating_sum, book.rating_avg), (2, 13, 6.5))
+        self.assertEqual((other.review_count, other.rating_sum, other.rating_avg), (1, 5, 5.0))
+
+        res = self.client.get(SEARCH_URL, {'q': 'sandworm'})
+        self.assertEqual([b['id'] for b in res.data['results']], [book.id])
+
+    def test_bulk_create_reviews_reports_item_errors(self):
+        book = book_create(user=self.user)
+        payload = [
+            {'book': book.id, 'title': 'Review', 'content': 'Content', 'rating': 7},
+            {'book': book.id, 'title': 'Review', 'content': 'Content'},
+            {'book': 0, 'title': 'Review', 'content': 'Content', 'rating': 7},
+            {'book': 2 ** 70, 'title': 'Review', 'content': 'Content', 'rating': 7},
+            {'book': book.id + 1000, 'title': 'Review', 'content': 'Content', 'rating': 7},
+        ]
+
+        res = self.client.post(BULK_REVIEWS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in res.data['results']], ['created'] + ['error'] * 4)
+        self.assertIn('rating', res.data['results'][1]['errors'])
+        for result in res.data['results'][2:]:
+            self.assertIn('book', result['errors'])
+        book.refresh_from_db()
+        self.assertEqual(book.review_count, 1)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_bulk_create_reviews_requires_list(self):
+        book = book_create(user=self.user)
+        payload = {'book': book.id, 'title': 'Review', 'content': 'Content', 'rating': 7}
+
+        res = self.client.post(BULK_REVIEWS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Review.objects.exists())
+
+    def test_filter_and_order_by_rating(self):
+        low = book_create(user=self.user, title='Low')
+        high = book_create(user=self.user, title='High')
+        book_create(user=self.user, title='Unrated')
+        Book.objects.filter(pk=low.pk).change_review_stats(2, 6)
+        Book.objects.filter(pk=high.pk).change_review_stats(1, 9)
+
+        res = self.client.get(BOOK_URL, {'min_rating': 3})
+        self.assertEqual([b['id'] for b in res.data['results']], [high.id, low.id])
+
+        res = self.client.get(BOOK_URL, {'ordering': '-rating_avg', 'min_reviews': 1})
+        self.assertEqual([b['title'] for b in res.data['results']], ['High', 'Low'])
+
+    def test_order_by_stats_pages_through_unreviewed_books(self):
+        unreviewed = [book_create(user=self.user) for _ in range(5)]
+        low = book_create(user=self.user)
+        high = book_create(user=self.user)
+        Book.objects.filter(pk=low.pk).change_review_stats(3, 6)
+        Book.objects.filter(pk=high.pk).change_review_stats(1, 9)
+        unreviewed_ids = [b.id for b in unreviewed]
+
+        cases = [
+            ('-rating_avg', [high.id, low.id] + unreviewed_ids[::-1]),
+            ('review_count', unreviewed_ids + [high.id, low.id]),
+        ]
+        for ordering, expected in cases:
+            seen = []
+            url = f'{BOOK_URL}?ordering={ordering}&page_size=2'
+            while url:
+                res = self.client.get(url)
+                seen.extend(b['id'] for b in res.data['results'])
+                url = res.data['next']
+
+            self.assertEqual(seen, expected, ordering)
+
+    @override_settings(BOOK_EMBEDDED_REVIEWS=2)
+    def test_embedded_reviews_capped(self):
+        book = book_create(user=self.user)
+        url = review_detail_url(book.id)
+        for rating in (5, 9, 1):
+            payload = {'title': f'Review {rating}', 'content': 'Content', 'rating': rating}
+            self.client.post(url, payload, format='json')
+
+        res = self.client.get(detail_url(book.id))
+
+        self.assertEqual(res.data['review_count'], 3)
+        self.assertEqual([r['title'] for r in res.data['reviews']], ['Review 1', 'Review 9'])
+        res = self.client.get(BOOK_URL)
+        self.assertEqual([r['title'] for r in res.data['results'][0]['reviews']], ['Review 1', 'Review 9'])
+
+    @override_settings(BOOK_EMBEDDED_REVIEWS=2, BOOK_EMBEDDED_REVIEWS_ORDERING=['-rating', '-id'])
+    def test_embedded_reviews_top_rated(self):
+        book = book_create(user=self.user)
+        for rating in (5, 9, 1):
+            book.reviews.add(create_review(user=self.user, title=f'Review {rating}', rating=rating))
+
+        res = self.client.get(detail_url(book.id))
+
+        self.assertEqual([r['title'] for r in res.data['reviews']], ['Review 9', 'Review 5'])
+
     def test_delete_only_owned_reviews(self):
         review = create_review(user=self.user)
         url = reverse('book:review-detail', args=(review.id,))
@@ -484,3 +1010,143 @@ class PublisherApiView(TestCase):
         url = reverse('book:review-detail', args=(review.id,))
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+SEARCH_URL = reverse('book:book-search')
+
+
+class BookSearchApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        cache.clear()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_book(self, **params):
+        payload = {
+            'title': 'Book Title',
+            'publication_date': '2023-01-01',
+            'isbn': f'{next(ISBNS):09d}',
+        }
+        payload.update(params)
+        res = self.client.post(BOOK_URL, payload, format='json')
+
+        return Book.objects.get(id=res.data['id'])
+
+    def test_search_by_title(self):
+        book = self._create_book(title='The Hobbit')
+        self._create_book(title='Dune')
+
+        res = self.client.get(SEARCH_URL, {'q': 'hobbit'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([b['id'] for b in res.data['results']], [book.id])
+        self.assertGreater(res.data['results'][0]['rank'], 0)
+
+    def test_search_by_review_content(self):
+        book = self._create_book(title='Dune')
+        payload = {'title': 'Great', 'content': 'Sandworms everywhere', 'rating': 9}
+        self.client.post(review_detail_url(book.id), payload, format='json')
+
+        res = self.client.get(SEARCH_URL, {'q': 'sandworm'})
+
+        self.assertEqual([b['id'] for b in res.data['results']], [book.id])
+
+    def test_search_ranks_title_matches_first(self):
+        reviewed = self._create_book(title='Dune')
+        titled = self._create_book(title='Dragons of Autumn')
+        payload = {'title': 'Review', 'content': 'Not a single dragon here', 'rating': 3}
+        self.client.post(review_detail_url(reviewed.id), payload, format='json')
+
+        res = self.client.get(SEARCH_URL, {'q': 'dragon'})
+
+        self.assertEqual([b['id'] for b in res.data['results']], [titled.id, reviewed.id])
+
+    def test_search_after_title_update_and_review_delete(self):
+        book = self._create_book(title='Dune')
+        payload = {'title': 'Review', 'content': 'Spice must flow', 'rating': 8}
+        self.client.post(review_detail_url(book.id), payload, format='json')
+        self.client.patch(detail_url(book.id), {'title': 'Children of Dune'}, format='json')
+
+        res = self.client.get(SEARCH_URL, {'q': 'children spice'})
+        self.assertEqual([b['id'] for b in res.data['results']], [book.id])
+
+        review = book.reviews.get()
+        self.client.delete(reverse('book:review-detail', args=(review.id,)))
+
+        res = self.client.get(SEARCH_URL, {'q': 'spice'})
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_requires_query(self):
+        res = self.client.get(SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(BOOK_CACHE_TIMEOUT=0)
+class SparseFieldsetTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.books = [
+            book_create(user=self.user, title=f'Dune {i}', rating_avg=i, review_count=i) for i in range(3)
+        ]
+        publisher = create_publisher(user=self.user)
+        review = create_review(user=self.user)
+        for book in self.books:
+            book.publishers.add(publisher)
+            book.reviews.add(review)
+
+    def test_fields(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(BOOK_URL, {'fields': 'id,title,isbn'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': book.id, 'title': book.title, 'isbn': book.isbn} for book in reversed(self.books)]
+        )
+
+    def test_expand(self):
+        with self.assertNumQueries(3):
+            res = self.client.get(BOOK_URL, {'expand': 'publishers'})
+
+        item = res.data['results'][0]
+        self.assertIn('publishers', item)
+        self.assertNotIn('reviews', item)
+        self.assertIn('rating_avg', item)
+
+    def test_fields_and_expand(self):
+        res = self.client.get(detail_url(self.books[0].id), {'fields': 'title', 'expand': 'reviews'})
+
+        self.assertEqual(list(res.data), ['title', 'reviews'])
+        self.assertEqual(res.data['reviews'][0]['title'], 'First review')
+
+    def test_ordering_field_not_requested(self):
+        res = self.client.get(BOOK_URL, {'fields': 'title', 'ordering': '-rating_avg', 'page_size': 2})
+        self.assertEqual(res.data['results'], [{'title': 'Dune 2'}, {'title': 'Dune 1'}])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(res.data['results'], [{'title': 'Dune 0'}])
+
+    def test_unknown_fields(self):
+        res = self.client.get(BOOK_URL, {'fields': 'id,password', 'expand': 'user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+        self.assertIn('expand', res.data)
+
+    def test_export(self):
+        res = self.client.get(EXPORT_URL, {'fields': 'id'})
+
+        lines = b''.join(res.streaming_content).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{'id': book.id} for book in reversed(self.books)])
+
+    def test_search(self):
+        Book.objects.all().update_search_vector()
+
+        res = self.client.get(reverse('book:book-search'), {'q': 'dune', 'fields': 'id,rank'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data['results'][0]), {'id', 'rank'})
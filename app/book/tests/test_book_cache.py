@@ -0,0 +1,170 @@
+"""Tests for the book response cache."""
+
+import itertools
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book import cache as book_cache
+from core.models import Book, Publisher, Review
+
+
+BOOK_URL = reverse('book:book-list')
+
+
+def detail_url(book_id):
+    return reverse('book:book-detail', args=[book_id])
+
+
+def review_manage_url(book_id):
+    return reverse('book:book-review-manage', args=[book_id])
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+ISBNS = itertools.count(1)
+
+
+def book_create(user, **params):
+    defaults = {
+        'title': 'Book Title',
+        'publication_date': '2023-01-01',
+        'isbn': f'{next(ISBNS):09d}',
+    }
+    defaults.update(params)
+
+    return Book.objects.create(user=user, **defaults)
+
+
+class BookCacheTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_served_from_cache(self):
+        book_create(user=self.user)
+        res = self.client.get(BOOK_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(BOOK_URL)
+
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(len(ctx), 0)
+        self.assertEqual(cached.data, res.data)
+
+    def test_query_string_is_part_of_key(self):
+        book_create(user=self.user, title='A')
+        self.client.get(BOOK_URL)
+
+        res = self.client.get(BOOK_URL, {'title': 'B'})
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'], [])
+
+    def test_create_invalidates_list(self):
+        self.client.get(BOOK_URL)
+        payload = {'title': 'New', 'publication_date': '2023-01-01', 'isbn': '1'}
+        self.client.post(BOOK_URL, payload, format='json')
+
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_update_invalidates_only_that_book(self):
+        book = book_create(user=self.user)
+        other = book_create(user=self.user)
+        self.client.get(detail_url(book.id))
+        self.client.get(detail_url(other.id))
+
+        self.client.patch(detail_url(book.id), {'title': 'Updated'}, format='json')
+
+        res = self.client.get(detail_url(book.id))
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['title'], 'Updated')
+        self.assertEqual(self.client.get(detail_url(other.id))['X-Cache'], 'HIT')
+
+    def test_update_invalidates_padded_id(self):
+        book = book_create(user=self.user)
+        url = f'{BOOK_URL}0{book.id}/'
+        self.client.get(url)
+
+        self.client.patch(detail_url(book.id), {'title': 'Updated'}, format='json')
+
+        res = self.client.get(url)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['title'], 'Updated')
+
+    def test_review_writes_invalidate_book(self):
+        book = book_create(user=self.user)
+        self.client.get(review_manage_url(book.id))
+        self.client.get(detail_url(book.id))
+
+        payload = {'title': 'Review', 'content': 'Content', 'rating': 5}
+        self.client.post(review_manage_url(book.id), payload, format='json')
+
+        res = self.client.get(review_manage_url(book.id))
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(self.client.get(detail_url(book.id)).data['review_count'], 1)
+
+        review = Review.objects.get()
+        self.client.delete(reverse('book:review-detail', args=(review.id,)))
+        res = self.client.get(review_manage_url(book.id))
+        self.assertEqual(res.data['results'], [])
+
+    def test_publisher_update_invalidates_books(self):
+        book = book_create(user=self.user)
+        publisher = Publisher.objects.create(
+            user=self.user, name='Old', website='https://example.com', email='p@example.com'
+        )
+        book.publishers.add(publisher)
+        self.client.get(detail_url(book.id))
+
+        url = reverse('book:publisher-detail', args=[publisher.id])
+        self.client.patch(url, {'name': 'New'}, format='json')
+
+        res = self.client.get(detail_url(book.id))
+        self.assertEqual(res.data['publishers'][0]['name'], 'New')
+
+    def test_delete_invalidates_detail(self):
+        book = book_create(user=self.user)
+        self.client.get(detail_url(book.id))
+
+        self.client.delete(detail_url(book.id))
+
+        res = self.client.get(detail_url(book.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_hit_ratio(self):
+        book_cache.stats.update(hits=0, misses=0)
+        for _ in range(4):
+            self.client.get(BOOK_URL)
+
+        self.assertEqual(book_cache.cache_stats(), {'hits': 3, 'misses': 1, 'hit_ratio': 0.75})
+
+    @override_settings(BOOK_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        self.client.get(BOOK_URL)
+
+        res = self.client.get(BOOK_URL)
+
+        self.assertNotIn('X-Cache', res)
@@ -0,0 +1,148 @@
+"""Query count regression tests for book endpoints."""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.views import BookApiView
+from core.models import (
+    Book,
+    Publisher,
+    Review
+)
+
+
+BOOK_URL = reverse('book:book-list')
+EXPORT_URL = reverse('book:book-export')
+BULK_URL = reverse('book:book-bulk-create')
+
+
+def detail_url(book_id):
+    return reverse('book:book-detail', args=[book_id])
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_books(user, count):
+    """Bulk create books with one publisher and one review each."""
+    publisher = Publisher.objects.create(
+        user=user,
+        name='Publisher',
+        website='https://example.com',
+        email='publisher@example.com'
+    )
+    offset = Book.objects.count()
+    books = Book.objects.bulk_create(
+        Book(
+            user=user,
+            title=f'Book {i}',
+            publication_date='2023-01-01',
+            isbn=f'978{offset + i:010d}'
+        ) for i in range(count)
+    )
+    reviews = Review.objects.bulk_create(
+        Review(user=user, title=f'Review {i}', content='Content', rating=5)
+        for i in range(count)
+    )
+    Book.publishers.through.objects.bulk_create(
+        Book.publishers.through(book_id=book.id, publisher_id=publisher.id)
+        for book in books
+    )
+    Book.reviews.through.objects.bulk_create(
+        Book.reviews.through(book_id=book.id, review_id=review.id)
+        for book, review in zip(books, reviews)
+    )
+
+    return books
+
+
+@override_settings(BOOK_CACHE_TIMEOUT=0)
+class BookQueryCountTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(BOOK_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return len(ctx)
+
+    def test_list_query_count_constant(self):
+        """Listing books does not issue queries per book."""
+        create_books(self.user, 10)
+        baseline = self._list_queries()
+
+        create_books(self.user, 9990)
+        self.assertEqual(Book.objects.count(), 10000)
+        self.assertEqual(self._list_queries(), baseline)
+
+    def test_list_query_count(self):
+        create_books(self.user, 10)
+
+        # Conditional GET validators, the page, publishers and reviews.
+        with self.assertNumQueries(4):
+            self.client.get(BOOK_URL)
+
+    def test_retrieve_query_count(self):
+        book = create_books(self.user, 1)[0]
+
+        with self.assertNumQueries(4):
+            res = self.client.get(detail_url(book.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['publishers']), 1)
+        self.assertEqual(len(res.data['reviews']), 1)
+
+    def test_export_queries_per_chunk(self):
+        """Nested relations are prefetched once per exported chunk."""
+        create_books(self.user, 25)
+
+        with mock.patch.object(BookApiView, 'export_chunk_size', 10):
+            res = self.client.get(EXPORT_URL)
+            with CaptureQueriesContext(connection) as ctx:
+                lines = b''.join(res.streaming_content).splitlines()
+
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(len(ctx), 1 + 3 * 2)
+
+    def _bulk_queries(self, count):
+        payload = [
+            {
+                'title': f'Book {i}',
+                'publication_date': '2023-01-01',
+                'isbn': f'{count}-{i}',
+                'publishers': [{
+                    'name': f'Publisher {count}-{i % 3}',
+                    'website': 'https://example.com',
+                    'email': 'publisher@example.com',
+                }],
+            } for i in range(count)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        return len(ctx)
+
+    def test_bulk_create_query_count_constant(self):
+        self.assertEqual(self._bulk_queries(10), self._bulk_queries(200))
+        self.assertEqual(Book.objects.count(), 210)
+        self.assertEqual(Publisher.objects.count(), 6)
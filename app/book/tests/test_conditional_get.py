@@ -0,0 +1,216 @@
+"""Tests for ETag / Last-Modified handling on book and publisher reads."""
+
+import itertools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Book, Publisher
+
+
+BOOK_URL = reverse('book:book-list')
+PUBLISHER_URL = reverse('book:publisher-list')
+
+
+def detail_url(book_id):
+    return reverse('book:book-detail', args=[book_id])
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+ISBNS = itertools.count(1)
+
+
+def book_create(user, **params):
+    defaults = {
+        'title': 'Book Title',
+        'publication_date': '2023-01-01',
+        'isbn': f'{next(ISBNS):09d}',
+    }
+    defaults.update(params)
+
+    return Book.objects.create(user=user, **defaults)
+
+
+def create_publisher(user, **params):
+    defaults = {
+        'name': 'Test Publisher',
+        'website': 'http://test.publisher.com',
+        'email': 'test.publisher@example.com',
+    }
+
+    defaults.update(params)
+    return Publisher.objects.create(user=user, **defaults)
+
+
+@override_settings(BOOK_CACHE_TIMEOUT=0)
+class ConditionalGetTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def test_detail_not_modified(self):
+        book = book_create(user=self.user)
+        res = self.client.get(detail_url(book.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'])
+        self.assertTrue(res['Last-Modified'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(detail_url(book.id), HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx), 1)
+
+    def test_detail_modified_by_review(self):
+        book = book_create(user=self.user)
+        etag = self.client.get(detail_url(book.id))['ETag']
+
+        url = reverse('book:book-review-manage', args=[book.id])
+        self.client.post(url, {'title': 'Review', 'content': 'Content', 'rating': 5}, format='json')
+
+        res = self.client.get(detail_url(book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_detail_modified_by_publisher(self):
+        book = book_create(user=self.user)
+        publisher = create_publisher(user=self.user)
+        book.publishers.add(publisher)
+        etag = self.client.get(detail_url(book.id))['ETag']
+
+        url = reverse('book:publisher-detail', args=[publisher.id])
+        self.client.patch(url, {'name': 'Renamed'}, format='json')
+
+        res = self.client.get(detail_url(book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_modified_by_publisher_delete(self):
+        book = book_create(user=self.user)
+        older = create_publisher(user=self.user, name='Older')
+        newer = create_publisher(user=self.user, name='Newer')
+        book.publishers.add(older, newer)
+        etag = self.client.get(detail_url(book.id))['ETag']
+
+        self.client.delete(reverse('book:publisher-detail', args=[older.id]))
+
+        res = self.client.get(detail_url(book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['name'] for p in res.data['publishers']], ['Newer'])
+
+    def test_if_modified_since(self):
+        book = book_create(user=self.user)
+        last_modified = self.client.get(detail_url(book.id))['Last-Modified']
+
+        res = self.client.get(detail_url(book.id), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(detail_url(book.id), HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_has_no_last_modified(self):
+        book_create(user=self.user, title='Kept')
+        deleted = book_create(user=self.user, title='Deleted')
+        res = self.client.get(BOOK_URL)
+        self.assertFalse(res.has_header('Last-Modified'))
+
+        self.client.delete(detail_url(deleted.id))
+
+        res = self.client.get(BOOK_URL, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([book['title'] for book in res.data['results']], ['Kept'])
+
+    def test_list_not_modified_until_books_change(self):
+        book_create(user=self.user)
+        etag = self.client.get(BOOK_URL)['ETag']
+
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        book_create(user=self.user)
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    @override_settings(COMPRESSION={**settings.COMPRESSION, 'MIN_SIZE': 0})
+    def test_compressed_list_not_modified(self):
+        """The weak ETag of a compressed response still validates."""
+        book_create(user=self.user)
+        res = self.client.get(BOOK_URL, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertTrue(res['ETag'].startswith('W/'))
+
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=res['ETag'], HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_modified_by_delete(self):
+        book_create(user=self.user)
+        book = book_create(user=self.user)
+        etag = self.client.get(BOOK_URL)['ETag']
+
+        book.delete()
+
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_publishers_not_modified(self):
+        publisher = create_publisher(user=self.user)
+        etag = self.client.get(PUBLISHER_URL)['ETag']
+
+        res = self.client.get(PUBLISHER_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        url = reverse('book:publisher-detail', args=[publisher.id])
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'name': 'Renamed'}, format='json')
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_missing_book(self):
+        res = self.client.get(detail_url(0))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_pk(self):
+        res = self.client.get(detail_url('abc'))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get(reverse('book:publisher-detail', args=['abc']))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CachedConditionalGetTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def test_not_modified_from_cache(self):
+        book = book_create(user=self.user)
+        etag = self.client.get(detail_url(book.id))['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(detail_url(book.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['X-Cache'], 'HIT')
+        self.assertEqual(len(ctx), 0)
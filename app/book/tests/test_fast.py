@@ -0,0 +1,82 @@
+"""Tests for the values() based serialization fast path."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from book.fast import FastSerializer, book_publishers, book_reviews
+from book.serializers import BookSerializerOnlyView, PublisherSerializer, ReviewSerializer
+from book.views import BookApiView
+from core.models import Book, Publisher, Review
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+class FastSerializerTest(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user()
+        publishers = [
+            Publisher.objects.create(
+                user=self.user,
+                name=f'Publisher "{i}" ünicode',
+                website=f'https://p{i}.example.com',
+                email=f'p{i}@example.com'
+            ) for i in range(3)
+        ]
+        for i in range(4):
+            book = Book.objects.create(
+                user=self.user,
+                title=f'Book {i}',
+                publication_date=f'19{50 + i}-0{i + 1}-15',
+                isbn=f'978{i:010d}',
+                review_count=i,
+                rating_avg=i / 3
+            )
+            book.publishers.add(*publishers[:i])
+            for j in range(i * 3):
+                book.reviews.add(Review.objects.create(user=self.user, title=f'R{j}', content='Text\n"quoted"', rating=j % 10))
+
+    def _drf_books(self):
+        view = BookApiView(action='list')
+        return BookSerializerOnlyView(view.get_queryset(), many=True).data
+
+    def _fast_books(self):
+        fast = FastSerializer(BookSerializerOnlyView)
+        rows = list(Book.objects.order_by('-id').values(*fast.columns))
+        book_ids = [row['id'] for row in rows]
+        return fast.to_representation(rows, {
+            'publishers': book_publishers(FastSerializer(PublisherSerializer), book_ids),
+            'reviews': book_reviews(FastSerializer(ReviewSerializer), book_ids),
+        })
+
+    def test_books_render_identically(self):
+        self.assertEqual(render(self._fast_books()), render(self._drf_books()))
+
+    @override_settings(BOOK_EMBEDDED_REVIEWS=2, BOOK_EMBEDDED_REVIEWS_ORDERING=['-rating', '-id'])
+    def test_embedded_review_settings(self):
+        self.assertEqual(render(self._fast_books()), render(self._drf_books()))
+
+    def test_flat_serializer(self):
+        fast = FastSerializer(PublisherSerializer)
+        publishers = Publisher.objects.order_by('id')
+
+        data = fast.to_representation(publishers.values(*fast.columns))
+
+        self.assertEqual(render(data), render(PublisherSerializer(publishers, many=True).data))
+
+    def test_query_count(self):
+        with self.assertNumQueries(3):
+            self._fast_books()
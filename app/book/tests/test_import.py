@@ -0,0 +1,135 @@
+"""Tests for catalogue file imports."""
+
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.importer import import_catalogue, read_rows
+from book.views import BookApiView
+from core.models import Book, Publisher
+
+
+IMPORT_URL = reverse('book:book-import-catalogue')
+
+CSV = (
+    'title,publication_date,isbn,publisher_name,publisher_website,publisher_email\n'
+    'First,2023-01-01,111,Acme|Globex,https://acme.com|https://globex.com,a@acme.com|g@globex.com\n'
+    'Second,2023-02-01,222,Acme,https://acme.com,a@acme.com\n'
+    'Broken,not-a-date,333,,,\n'
+)
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class ImportCatalogueTest(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_import_csv(self):
+        upload = SimpleUploadedFile('catalogue.csv', CSV.encode())
+
+        res = self.client.post(IMPORT_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(res.data['rows'], 3)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['rejected'], 1)
+        self.assertEqual(res.data['errors'][0]['row'], 3)
+        self.assertIn('publication_date', res.data['errors'][0]['errors'])
+        self.assertEqual(Publisher.objects.count(), 2)
+        first = Book.objects.get(title='First')
+        self.assertEqual(first.publishers.count(), 2)
+        self.assertIsNotNone(first.search_vector)
+
+    def test_import_jsonl(self):
+        lines = [
+            json.dumps({'title': 'One', 'publication_date': '2023-01-01', 'isbn': '1'}),
+            '{not json',
+            '',
+            json.dumps({
+                'title': 'Two', 'publication_date': '2023-01-01', 'isbn': '2',
+                'publishers': [{'name': 'Acme', 'website': 'https://acme.com', 'email': 'a@acme.com'}],
+            }),
+        ]
+        upload = SimpleUploadedFile('catalogue.jsonl', '\n'.join(lines).encode())
+
+        res = self.client.post(IMPORT_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['errors'], [{'row': 2, 'errors': {'non_field_errors': ['Invalid JSON.']}}])
+
+    def test_all_rows_created(self):
+        upload = SimpleUploadedFile('catalogue.csv', CSV.rsplit('Broken', 1)[0].encode())
+
+        res = self.client.post(IMPORT_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Book.objects.filter(user=self.user).count(), 2)
+
+    def test_unknown_format(self):
+        upload = SimpleUploadedFile('catalogue.xml', b'<books/>')
+
+        res = self.client.post(IMPORT_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('message', res.data)
+
+    @mock.patch.object(BookApiView, 'import_max_bytes', 100)
+    def test_upload_too_large(self):
+        upload = SimpleUploadedFile('catalogue.csv', CSV.encode())
+
+        res = self.client.post(IMPORT_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('import_catalogue', res.data['message'])
+        self.assertFalse(Book.objects.exists())
+
+    def test_missing_file(self):
+        res = self.client.post(IMPORT_URL, {}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batches(self):
+        rows = read_rows(StringIO(CSV * 3), 'csv')
+
+        report = import_catalogue(self.user, rows, batch_size=2)
+
+        # Repeated header lines and ISBNs from earlier batches are rejected.
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.rejected, 9)
+        self.assertEqual(Publisher.objects.count(), 2)
+        self.assertIn({'row': 5, 'errors': {'isbn': ['You already have a book with this ISBN.']}}, report.errors)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fh:
+            fh.write(CSV)
+        self.addCleanup(os.remove, fh.name)
+        out, err = StringIO(), StringIO()
+
+        call_command('import_catalogue', fh.name, user=self.user.email, stdout=out, stderr=err)
+
+        self.assertIn('Imported 2 of 3 row(s), 1 rejected', out.getvalue())
+        self.assertIn('row 3', err.getvalue())
+        self.assertEqual(Book.objects.count(), 2)
@@ -1,19 +1,37 @@
 from rest_framework import (
     viewsets,
     permissions,
-    authentication,
     status,
     mixins
 )
+from rest_framework import serializers
+from rest_framework.parsers import MultiPartParser
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.db.models.functions import Now
+from django.http import StreamingHttpResponse
 from book.serializers import (
     BookSerializer,
     PublisherSerializer,
     ReviewSerializer,
-    BookSerializerOnlyView
+    BookSerializerOnlyView,
+    BookSearchSerializer,
+    IsbnField
 )
+from book.bulk import bulk_create_books, bulk_create_reviews, upsert_book
+from book.cache import acached_response, cached_response, invalidate_books
+from book.fast import FastReadMixin, FastSerializer, fieldset_serializer, publisher_rows, review_rows
+from book.importer import detect_format, import_catalogue, read_rows
+from book.filters import QueryParamFilterBackend, StableOrderingFilter
+from book.mixins import ConditionalGetMixin, SparseFieldsetMixin
+from book.pagination import IdCursorPagination, RankedPagination
 from book.permissions import IsOwnerOrReadOnly, EveryoneCanAddReview
+from user.authentication import CachedTokenAuthentication
 from core.models import (
+    SEARCH_CONFIG,
     Book,
     Publisher,
     Review
@@ -21,55 +39,303 @@ from core.models import (
 
 from rest_framework.decorators import action
 
+import io
+from itertools import islice
 
-class BookApiView(viewsets.ModelViewSet):
+
+FAST_PUBLISHER = FastSerializer(PublisherSerializer)
+FAST_REVIEW = FastSerializer(ReviewSerializer)
+
+
+class BookApiView(SparseFieldsetMixin, FastReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = BookSerializer
     queryset = Book.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    filter_backends = [QueryParamFilterBackend, StableOrderingFilter]
+    query_filters = {
+        'isbn': ('isbn', IsbnField()),
+        'title': ('title__istartswith', serializers.CharField()),
+        'published_after': ('publication_date__gte', serializers.DateField()),
+        'published_before': ('publication_date__lte', serializers.DateField()),
+        'publisher': ('publishers', serializers.IntegerField()),
+        'user': ('user', serializers.IntegerField()),
+        'min_rating': ('rating_avg__gte', serializers.FloatField()),
+        'min_reviews': ('review_count__gte', serializers.IntegerField()),
+    }
+    # Unreviewed books tie on the stats fields; the keyset cursor in
+    # `IdCursorPagination` pages through ties on (field, id).
+    ordering_fields = ['id', 'title', 'publication_date', 'rating_avg', 'review_count']
+    ordering = ['-id']
+    modified_relations = ['publishers']
+    expandable_fields = ['publishers', 'reviews']
+    export_chunk_size = 1000
+    bulk_max_items = 5000
+    import_batch_size = 1000
+    # About 50,000 CSV rows, which import in well under a minute.
+    import_max_bytes = 5 * 1024 * 1024
+    fast_serializer = FastSerializer(BookSerializerOnlyView)
 
     def get_queryset(self):
-        return self.queryset.all().order_by('-id')
+        queryset = self.queryset.all().order_by('-id')
+        if self.action in ('list', 'retrieve', 'export', 'search'):
+            fields = self.requested_fields(self.get_serializer_class())
+            queryset = queryset.defer('search_vector')
+            if fields is not None:
+                queryset = queryset.only(*(fields & {field.name for field in Book._meta.concrete_fields}))
+            if fields is None or 'publishers' in fields:
+                queryset = queryset.prefetch_related(Prefetch(
+                    'publishers',
+                    queryset=Publisher.objects.only(*PublisherSerializer.Meta.fields).order_by('id')
+                ))
+            if fields is None or 'reviews' in fields:
+                queryset = queryset.prefetch_related(Prefetch(
+                    'reviews',
+                    queryset=Review.objects.only(*ReviewSerializer.Meta.fields).embedded(),
+                    to_attr='_embedded_reviews'
+                ))
+        return queryset
+
+    def get_fast_serializer(self):
+        fields = self.requested_fields(BookSerializerOnlyView)
+        if fields is None:
+            return self.fast_serializer
+
+        # Rows keep the columns cursor pagination and relation lookups need.
+        ordering = StableOrderingFilter().get_ordering(self.request, self.queryset, self) or self.ordering
+        extra_columns = tuple(sorted({'id'} | {field.lstrip('-') for field in ordering}))
+        return fieldset_serializer(BookSerializerOnlyView, fields, extra_columns)
+
+    def fast_related_rows(self, rows):
+        book_ids = [row['id'] for row in rows]
+        nested = self.get_fast_serializer().nested
+        related = {}
+        if 'publishers' in nested:
+            related['publishers'] = (FAST_PUBLISHER, publisher_rows(FAST_PUBLISHER, book_ids))
+        if 'reviews' in nested:
+            related['reviews'] = (FAST_REVIEW, review_rows(FAST_REVIEW, book_ids))
+
+        return related
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        book_id = instance.pk
+        instance.delete()
+        invalidate_books([book_id])
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, lambda: self.conditional_response(
+            request,
+            lambda: self.fast_list(request)
+        ))
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, lambda: self.conditional_response(
+            request,
+            lambda: self.fast_retrieve(request, kwargs['pk']),
+            pk=kwargs['pk']
+        ), book_id=kwargs['pk'])
+
+    async def alist(self, request, *args, **kwargs):
+        """`list` for the async views, reading through the async ORM."""
+        return await acached_response(request, lambda: self.aconditional_response(
+            request,
+            lambda: self.afast_list(request)
+        ))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await acached_response(request, lambda: self.aconditional_response(
+            request,
+            lambda: self.afast_retrieve(request, kwargs['pk']),
+            pk=kwargs['pk']
+        ), book_id=kwargs['pk'])
+
     def get_serializer_class(self):
         if self.action == 'list':
             return BookSerializerOnlyView
         elif self.action == 'retrieve':
             return BookSerializerOnlyView
+        elif self.action == 'export':
+            return BookSerializerOnlyView
+        elif self.action == 'search':
+            return BookSearchSerializer
         elif self.action == 'review_manage':
             return ReviewSerializer
         return BookSerializer
 
+    def _export_lines(self, rows):
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        while True:
+            chunk = list(islice(rows, self.export_chunk_size))
+            if not chunk:
+                return
+            yield b''.join(renderer.render(item) + b'\n' for item in self.fast_data(chunk))
+
+    @action(['GET'], detail=False, url_path='export')
+    def export(self, request):
+        """Stream every book as newline delimited JSON."""
+        rows = self.fast_rows(self.filter_queryset(self.get_queryset())).iterator(chunk_size=self.export_chunk_size)
+        response = StreamingHttpResponse(self._export_lines(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="books.ndjson"'
+        return response
+
+    @action(['GET'], detail=False, url_path='search', pagination_class=RankedPagination)
+    def search(self, request):
+        """Full-text search over titles and review text, best matches first."""
+        terms = request.query_params.get('q', '').strip()
+        if not terms:
+            return Response({'q': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+        books = self.filter_queryset(self.get_queryset()).filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-id')
+        page = self.paginate_queryset(books)
+        serializer = self.get_serializer(page, many=True, fields=self.requested_fields(BookSearchSerializer))
+        return self.get_paginated_response(serializer.data)
+
+    @action(['POST'], detail=False, url_path='bulk')
+    def bulk_create(self, request):
+        """Create many books at once, reporting the status of every item."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'message': 'Expected a list of books.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'message': f'At most {self.bulk_max_items} books per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = bulk_create_books(request.user, items)
+        errors = sum(1 for result in results if result['status'] == 'error')
+        return Response(
+            {'created': len(results) - errors, 'errors': errors, 'results': results},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED
+        )
+
+    @action(['POST'], detail=False, url_path='reviews/bulk', permission_classes=[
+        permissions.IsAuthenticated, EveryoneCanAddReview])
+    def bulk_reviews(self, request):
+        """Add many reviews to one or more books, reporting the status of every item."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'message': 'Expected a list of reviews.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'message': f'At most {self.bulk_max_items} reviews per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = bulk_create_reviews(request.user, items)
+        errors = sum(1 for result in results if result['status'] == 'error')
+        return Response(
+            {'created': len(results) - errors, 'errors': errors, 'results': results},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED
+        )
+
+    @action(['PUT'], detail=False, url_path='upsert')
+    def upsert(self, request):
+        """Create or update the caller's book with the given ISBN."""
+        serializer = BookSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        book, state = upsert_book(request.user, serializer.validated_data)
+        return Response(
+            {**BookSerializer(book).data, 'status': state},
+            status=status.HTTP_201_CREATED if state == 'created' else status.HTTP_200_OK
+        )
+
+    @action(['POST'], detail=False, url_path='import', parser_classes=[MultiPartParser])
+    def import_catalogue(self, request):
+        """Import an uploaded CSV or JSON Lines catalogue file."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'message': 'Upload the catalogue as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        if upload.size > self.import_max_bytes:
+            # Batches commit as they go, so the import must finish within the request.
+            return Response(
+                {'message': f'Uploads are limited to {self.import_max_bytes // (1024 * 1024)} MB, '
+                            'load larger catalogues with "manage.py import_catalogue".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            file_format = request.data.get('file_format') or detect_format(upload.name)
+            rows = read_rows(io.TextIOWrapper(upload, encoding='utf-8', newline=''), file_format)
+            report = import_catalogue(request.user, rows, batch_size=self.import_batch_size)
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({'message': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            report.as_dict(),
+            status=status.HTTP_207_MULTI_STATUS if report.rejected else status.HTTP_201_CREATED
+        )
+
+    def _list_reviews(self, request):
+        book = self.get_object()
+        paginator = IdCursorPagination()
+        reviews = paginator.paginate_queryset(book.reviews.values(*FAST_REVIEW.columns), request)
+        return paginator.get_paginated_response(FAST_REVIEW.to_representation(reviews))
+
     @action(['GET', 'POST'], detail=True, url_path='review-manage', permission_classes=[
-        permissions.IsAuthenticated, EveryoneCanAddReview], authentication_classes=[authentication.TokenAuthentication])
+        permissions.IsAuthenticated, EveryoneCanAddReview], authentication_classes=[CachedTokenAuthentication])
     def review_manage(self, request, pk=None):
-        book = self.get_object()
         if request.method == 'GET':
-            reviews = book.reviews.all()
-            serializer = ReviewSerializer(reviews, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return cached_response(request, lambda: self._list_reviews(request), book_id=pk)
 
-        elif request.method == 'POST':
+        book = self.get_object()
+        if request.method == 'POST':
             reviews = request.data
             serializer = ReviewSerializer(data=reviews)
             if serializer.is_valid():
-                reviews_obj = serializer.save(user=request.user)
-                book.reviews.add(reviews_obj)
+                with transaction.atomic():
+                    reviews_obj = serializer.save(user=request.user)
+                    book.reviews.add(reviews_obj)
+                    books = Book.objects.filter(pk=book.pk)
+                    books.change_review_stats(1, reviews_obj.rating)
+                    books.append_review_search_text(reviews_obj)
+                    invalidate_books([book.pk])
                 return Response(serializer.validated_data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PublisherApiView(viewsets.ModelViewSet):
+class PublisherApiView(FastReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = PublisherSerializer
     queryset = Publisher.objects.all()
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    fast_serializer = FAST_PUBLISHER
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user).order_by('-id')
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, lambda: self.fast_list(request))
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(request, lambda: self.afast_list(request))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: self.fast_retrieve(request, kwargs['pk']),
+            pk=kwargs['pk']
+        )
+
+    def perform_update(self, serializer):
+        publisher = serializer.save()
+        invalidate_books(publisher.book_set.values_list('id', flat=True))
+
+    def perform_destroy(self, instance):
+        book_ids = list(instance.book_set.values_list('id', flat=True))
+        with transaction.atomic():
+            instance.delete()
+            # The books' validators cannot see a publisher that is gone.
+            Book.objects.filter(pk__in=book_ids).update(updated_at=Now())
+            invalidate_books(book_ids)
+
     def create(self, request, *args, **kwargs):
         user = request.user
         data = request.data
@@ -86,7 +352,16 @@ class ReviewApiView(mixins.DestroyModelMixin, viewsets.GenericViewSet):
     serializer_class = ReviewSerializer
     queryset = Review.objects.all()
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            book_ids = list(instance.book_set.values_list('id', flat=True))
+            instance.delete()
+            books = Book.objects.filter(pk__in=book_ids)
+            books.change_review_stats(-1, -instance.rating)
+            books.update_search_vector()
+            invalidate_books(book_ids)
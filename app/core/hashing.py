@@ -0,0 +1,101 @@
+"""Password hashing off the request thread.
+
+Hashing is CPU bound and `hashlib.pbkdf2_hmac` releases the GIL, so a
+small thread pool lets a worker verify several passwords at once while
+keeping the number of concurrent hashes bounded. When all slots are taken
+for longer than `PASSWORD_HASHING['TIMEOUT']` seconds, `HashingBusy` is
+raised so the caller can shed load instead of queueing indefinitely.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from core import metrics
+
+stats = {'hashed': 0, 'rejected': 0}
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class ConfigurablePBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 with the iteration count taken from settings.
+
+    Keeps the `pbkdf2_sha256` algorithm name, so existing hashes verify and
+    are rehashed with the configured cost on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASHING['ITERATIONS'] or super().iterations
+
+
+def _pool():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = settings.PASSWORD_HASHING['WORKERS']
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            _slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING['QUEUE_SIZE'])
+
+    return _executor, _slots
+
+
+def shutdown():
+    global _executor, _slots
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = _slots = None
+
+
+def submit(func, *args):
+    """Schedule `func(*args)` on the hashing pool and return its future."""
+    executor, slots = _pool()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING['TIMEOUT']):
+        stats['rejected'] += 1
+        metrics.PASSWORD_HASH_REJECTED.inc()
+        raise HashingBusy('Password hashing capacity exceeded.')
+
+    stats['hashed'] += 1
+    future = executor.submit(func, *args)
+    future.add_done_callback(lambda _: slots.release())
+
+    return future
+
+
+def run(func, *args):
+    if not settings.PASSWORD_HASHING['WORKERS']:
+        stats['hashed'] += 1
+        return func(*args)
+
+    return submit(func, *args).result()
+
+
+def _verify(password, encoded):
+    rehash = []
+    valid = hashers.check_password(password, encoded, setter=rehash.append)
+
+    return valid, bool(rehash)
+
+
+def make_password(password):
+    return run(hashers.make_password, password)
+
+
+def check_password(user, password):
+    """Verify `password` for `user`, upgrading the stored hash if outdated."""
+    valid, rehash = run(_verify, password, user.password)
+    if valid and rehash:
+        user.password = make_password(password)
+        user.save(update_fields=['password'])
+
+    return valid
@@ -0,0 +1,29 @@
+"""ISBN canonicalization.
+
+Hyphens and spaces are dropped and valid ISBN-10s are converted to their
+ISBN-13 form, so the same book always has the same `Book.isbn`. Values
+that are not valid ISBNs are kept as given, apart from the separators.
+"""
+
+SEPARATORS = str.maketrans('', '', '- ')
+
+
+def isbn10_is_valid(value):
+    if len(value) != 10 or not value[:9].isdigit() or not (value[9].isdigit() or value[9] == 'X'):
+        return False
+    digits = [int(d) for d in value[:9]] + [10 if value[9] == 'X' else int(value[9])]
+
+    return sum((10 - i) * d for i, d in enumerate(digits)) % 11 == 0
+
+
+def isbn13_check_digit(first12):
+    return str((10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(first12)) % 10) % 10)
+
+
+def normalize_isbn(value):
+    value = value.strip().translate(SEPARATORS).upper()
+    if isbn10_is_valid(value):
+        first12 = '978' + value[:9]
+        return first12 + isbn13_check_digit(first12)
+
+    return value
@@ -0,0 +1,163 @@
+import json
+import random
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from core.models import Book
+from core.seeding import WORDS, CatalogueGenerator
+
+ISOLATED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}}
+
+
+class Command(BaseCommand):
+    help = 'Seed a catalogue, drive the main API endpoints with concurrent clients and report latency as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--publishers', type=int, default=100)
+        parser.add_argument('--books', type=int, default=5000)
+        parser.add_argument('--review-alpha', type=float, default=1.5, help='Pareto shape of reviews per book.')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients, each with its own connection.')
+        parser.add_argument('--endpoint', action='append', help='Only run the named endpoint(s).')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for data and request parameters.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument(
+            '--use-current-db',
+            action='store_true',
+            help='Seed the configured database instead of a throwaway test database.'
+        )
+
+    def handle(self, *args, **options):
+        old_name = None
+        if not options['use_current_db']:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=ISOLATED_CACHES, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                report = self._benchmark(options)
+        finally:
+            if old_name is not None:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def _endpoints(self, book_ids):
+        return {
+            'book_list': lambda rng: '/api/book/books/',
+            'book_list_by_rating': lambda rng: '/api/book/books/?ordering=-rating_avg',
+            'book_list_filtered': lambda rng: f'/api/book/books/?title={rng.choice(WORDS)}',
+            'book_detail': lambda rng: f'/api/book/books/{rng.choice(book_ids)}/',
+            'book_reviews': lambda rng: f'/api/book/books/{rng.choice(book_ids)}/review-manage/',
+            'book_search': lambda rng: f'/api/book/books/search/?q={rng.choice(WORDS)}',
+            'publisher_list': lambda rng: '/api/book/publishers/',
+            'me': lambda rng: '/api/user/me/',
+        }
+
+    def _benchmark(self, options):
+        rng = random.Random(options['seed'])
+        start = time.perf_counter()
+        generator = CatalogueGenerator(
+            seed=options['seed'],
+            users=options['users'],
+            publishers=options['publishers'],
+            books=options['books'],
+            review_alpha=options['review_alpha'],
+        )
+        counts = generator.generate()
+        seed_seconds = time.perf_counter() - start
+        token = Token.objects.create(user_id=generator.user_ids[0])
+        book_ids = list(Book.objects.values_list('id', flat=True))
+
+        endpoints = self._endpoints(book_ids)
+        names = options['endpoint'] or list(endpoints)
+        results = {}
+        for name in names:
+            url_for = endpoints[name]
+            self._drive(url_for, token.key, options['warmup'], options['concurrency'], rng)
+            results[name] = self._drive(url_for, token.key, options['requests'], options['concurrency'], rng)
+
+        return {
+            'config': {
+                'users': options['users'],
+                'publishers': options['publishers'],
+                'books': options['books'],
+                'review_alpha': options['review_alpha'],
+                'reviews': counts['reviews'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'seed': options['seed'],
+                'book_cache_timeout': settings.BOOK_CACHE_TIMEOUT,
+                'page_size': settings.REST_FRAMEWORK['PAGE_SIZE'],
+            },
+            'seed_seconds': round(seed_seconds, 3),
+            'endpoints': results,
+        }
+
+    def _drive(self, url_for, token, requests, concurrency, rng):
+        """Issue `requests` GETs from `concurrency` threads and summarize them."""
+        urls = [url_for(rng) for _ in range(requests)]
+        samples = []
+        lock = threading.Lock()
+
+        def client_loop(share):
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            try:
+                for url in share:
+                    with CaptureQueriesContext(connection) as ctx:
+                        begin = time.perf_counter()
+                        response = client.get(url)
+                        elapsed = time.perf_counter() - begin
+                    with lock:
+                        samples.append((elapsed, len(ctx), response.status_code))
+            finally:
+                if threading.current_thread() is not threading.main_thread():
+                    connection.close()
+
+        start = time.perf_counter()
+        if concurrency <= 1:
+            client_loop(urls)
+        else:
+            threads = [threading.Thread(target=client_loop, args=(urls[i::concurrency],)) for i in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        wall = time.perf_counter() - start
+
+        return summarize(samples, wall)
+
+
+def summarize(samples, wall):
+    if not samples:
+        return {'requests': 0}
+
+    latencies = sorted(elapsed for elapsed, _, _ in samples)
+    queries = [count for _, count, _ in samples]
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status in samples if status >= 400),
+        'throughput_rps': round(len(samples) / wall, 2),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p95_ms': round(quantiles[94] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+    }
@@ -0,0 +1,97 @@
+import datetime
+import io
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONParser, ORJSONRenderer, orjson
+from core.seeding import EPOCH, WORDS
+
+BACKENDS = {
+    'stdlib': (JSONRenderer, JSONParser),
+    'orjson': (ORJSONRenderer, ORJSONParser),
+}
+
+
+def book_page(rng, size):
+    """A book list page shaped like the `books/` endpoint output."""
+    def title(words):
+        return ' '.join(rng.sample(WORDS, words)).title()
+
+    return {
+        'next': 'http://localhost:8000/api/book/books/?cursor=cD0xMjM0NQ%3D%3D',
+        'previous': None,
+        'results': [{
+            'id': 100000 - i,
+            'title': title(rng.randint(1, 4)),
+            'publication_date': (EPOCH + datetime.timedelta(days=rng.randrange(27000))).isoformat(),
+            'isbn': f'978{rng.randrange(10 ** 10):010d}',
+            'publishers': [{
+                'id': rng.randrange(1000),
+                'name': f'{title(2)} Press',
+                'website': 'https://publisher.example.com',
+                'email': 'contact@publisher.example.com',
+            } for _ in range(rng.randint(1, 3))],
+            'review_count': rng.randrange(50),
+            'rating_avg': rng.uniform(1, 10),
+            'reviews': [{
+                'id': rng.randrange(10 ** 6),
+                'title': title(2),
+                'content': ' '.join(rng.choices(WORDS, k=rng.randint(10, 60))),
+                'rating': rng.randint(1, 10),
+            } for _ in range(rng.randint(0, 5))],
+        } for i in range(size)],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare the stdlib and orjson renderers and parsers on book list pages and report timings as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, action='append', help='Books per page (default: 25, 100 and 1000).')
+        parser.add_argument('--repeat', type=int, default=200, help='Timed runs per page; the median is reported.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        results = {}
+        for size in options['size'] or [25, 100, 1000]:
+            page = book_page(rng, size)
+            results[str(size)] = {
+                name: self._measure(renderer_class(), parser_class(), page, options['repeat'])
+                for name, (renderer_class, parser_class) in BACKENDS.items()
+            }
+            results[str(size)]['identical'] = len({renderer_class().render(page) for renderer_class, _ in BACKENDS.values()}) == 1
+
+        report = {'orjson_version': orjson.__version__ if orjson else None, 'repeat': options['repeat'], 'results': results}
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+
+    def _measure(self, renderer, parser, page, repeat):
+        body = renderer.render(page)
+        encode = []
+        decode = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            renderer.render(page)
+            encode.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            parser.parse(io.BytesIO(body))
+            decode.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        renderer.render(page)
+        _, encode_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'bytes': len(body),
+            'encode_us': round(statistics.median(encode) * 1e6, 1),
+            'decode_us': round(statistics.median(decode) * 1e6, 1),
+            'encode_peak_kib': round(encode_peak / 1024, 1),
+        }
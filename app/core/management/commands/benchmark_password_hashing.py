@@ -0,0 +1,56 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand
+
+from core import hashing
+
+
+class Command(BaseCommand):
+    help = 'Measure password verifications per second per core, inline and on the hashing pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            nargs='+',
+            help='PBKDF2 iteration counts to compare (default: Django default and the configured cost).'
+        )
+        parser.add_argument('--logins', type=int, default=50, help='Verifications per run.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients in pool mode.')
+
+    def handle(self, *args, **options):
+        default = hashers.PBKDF2PasswordHasher.iterations
+        iterations = options['iterations'] or sorted({default, settings.PASSWORD_HASHING['ITERATIONS'] or default})
+        cores = os.cpu_count() or 1
+        logins = options['logins']
+        hasher = hashers.PBKDF2PasswordHasher()
+
+        self.stdout.write(f'{cores} core(s), {settings.PASSWORD_HASHING["WORKERS"]} hashing worker(s), {logins} logins per run')
+        for count in iterations:
+            encoded = hasher.encode('benchmark-password', hasher.salt(), count)
+            for mode in ('inline', 'pool'):
+                elapsed = self._run(mode, encoded, logins, options['concurrency'])
+                rate = logins / elapsed
+                self.stdout.write(
+                    f'iterations={count:<8} mode={mode:<6} {rate:8.1f} logins/s {rate / cores:8.1f} logins/s/core'
+                )
+
+    def _run(self, mode, encoded, logins, concurrency):
+        def login(_):
+            if mode == 'pool':
+                return hashing.submit(hashers.check_password, 'benchmark-password', encoded).result()
+
+            return hashers.check_password('benchmark-password', encoded)
+
+        workers = concurrency if mode == 'pool' else 1
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as clients:
+            results = list(clients.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+        assert all(results)
+
+        return elapsed
@@ -0,0 +1,101 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from rest_framework.renderers import JSONRenderer
+
+from book.serializers import BookSerializerOnlyView
+from book.views import BookApiView
+from core.seeding import CatalogueGenerator
+
+
+class Command(BaseCommand):
+    help = 'Compare the DRF serializers with the values() fast path on book pages and report timings as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, action='append', help='Books per measured page (default: 1000 and 10000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Measured runs per page size; the median is reported.')
+        parser.add_argument('--review-alpha', type=float, default=1.5, help='Pareto shape of reviews per book.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument(
+            '--use-current-db',
+            action='store_true',
+            help='Seed the configured database instead of a throwaway test database.'
+        )
+
+    def handle(self, *args, **options):
+        old_name = None
+        if not options['use_current_db']:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self._benchmark(options)
+        finally:
+            if old_name is not None:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def _benchmark(self, options):
+        sizes = options['rows'] or [1000, 10000]
+        generator = CatalogueGenerator(
+            seed=options['seed'],
+            users=10,
+            publishers=200,
+            books=max(sizes),
+            review_alpha=options['review_alpha'],
+        )
+        counts = generator.generate()
+        view = BookApiView(action='list')
+        results = {}
+        for size in sizes:
+            queryset = view.get_queryset()[:size]
+            drf = [self._run_drf(queryset) for _ in range(options['repeat'])]
+            fast = [self._run_fast(view, queryset) for _ in range(options['repeat'])]
+            results[str(size)] = {
+                'drf': summarize(drf),
+                'fast': summarize(fast),
+                'identical': drf[0][-1] == fast[0][-1],
+                'speedup': round(statistics.median(run[0] for run in drf) / statistics.median(run[0] for run in fast), 2),
+            }
+
+        return {
+            'config': {'rows': sizes, 'repeat': options['repeat'], 'reviews': counts['reviews'], 'seed': options['seed']},
+            'results': results,
+        }
+
+    def _run_drf(self, queryset):
+        start = time.perf_counter()
+        books = list(queryset.all())
+        fetched = time.perf_counter()
+        data = BookSerializerOnlyView(books, many=True).data
+        serialized = time.perf_counter()
+        body = JSONRenderer().render(data)
+
+        return time.perf_counter() - start, fetched - start, serialized - fetched, body
+
+    def _run_fast(self, view, queryset):
+        start = time.perf_counter()
+        rows = list(view.fast_rows(queryset.all()))
+        related = view.fast_related(rows)
+        fetched = time.perf_counter()
+        data = view.fast_serializer.to_representation(rows, related)
+        serialized = time.perf_counter()
+        body = JSONRenderer().render(data)
+
+        return time.perf_counter() - start, fetched - start, serialized - fetched, body
+
+
+def summarize(runs):
+    return {
+        name: round(statistics.median(run[index] for run in runs) * 1000, 2)
+        for index, name in enumerate(['total_ms', 'fetch_ms', 'serialize_ms'])
+    }
@@ -0,0 +1,50 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from book.importer import detect_format, import_catalogue, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV or JSON Lines catalogue file of books and publishers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalogue file, .csv, .jsonl or .ndjson.')
+        parser.add_argument('--user', required=True, help='Email of the user owning the imported books.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Override the format guessed from the extension.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted per transaction.')
+        parser.add_argument('--max-errors', type=int, default=100, help='Rejected rows to list in the report.')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["user"]!r}.')
+
+        try:
+            file_format = options['format'] or detect_format(options['path'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        def progress(report):
+            self.stdout.write(f'{report.rows} rows, {report.created} created, {report.rejected} rejected '
+                              f'({report.rows / report.elapsed:.0f} rows/s)')
+
+        with open(options['path'], newline='', encoding='utf-8') as stream:
+            report = import_catalogue(
+                user,
+                read_rows(stream, file_format),
+                batch_size=options['batch_size'],
+                max_errors=options['max_errors'],
+                progress=progress if options['verbosity'] else None,
+            )
+
+        summary = report.as_dict()
+        for error in summary['errors']:
+            self.stderr.write(f'row {error["row"]}: {json.dumps(error["errors"])}')
+        style = self.style.WARNING if report.rejected else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Imported {report.created} of {report.rows} row(s), {report.rejected} rejected, '
+            f'{summary["rows_per_second"]} rows/s.'
+        ))
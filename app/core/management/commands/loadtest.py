@@ -0,0 +1,58 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent GET requests at running servers and compare throughput and latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            required=True,
+            help='Endpoint to load, repeat to compare e.g. the WSGI and ASGI servers.'
+        )
+        parser.add_argument('--token', help='API token sent as "Authorization: Token <token>".')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per URL.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients.')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f'Token {options["token"]}'} if options['token'] else {}
+        for url in options['url']:
+            self._load(url, headers, options)
+
+    def _load(self, url, headers, options):
+        def fetch(_):
+            request = urllib.request.Request(url, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return ok, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as clients:
+            results = list(clients.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for ok, latency in results if ok)
+        errors = len(results) - len(latencies)
+        self.stdout.write(url)
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f'  all {errors} request(s) failed'))
+            return
+
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f'  {len(results) / elapsed:.1f} req/s, {errors} error(s), '
+            f'p50 {quantiles[49] * 1000:.1f}ms p95 {quantiles[94] * 1000:.1f}ms p99 {quantiles[98] * 1000:.1f}ms'
+        )
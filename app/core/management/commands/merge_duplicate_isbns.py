@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import Now
+
+from book.cache import invalidate_books
+from core.isbn import normalize_isbn
+from core.models import Book
+
+
+def duplicate_groups():
+    """`{(user_id, isbn): [book_id, ...]}` for books sharing an owner and canonical ISBN."""
+    groups = defaultdict(list)
+    books = Book.objects.order_by('id').values_list('id', 'user_id', 'isbn')
+    for book_id, user_id, isbn in books.iterator(chunk_size=5000):
+        groups[user_id, normalize_isbn(isbn)].append(book_id)
+
+    return {key: book_ids for key, book_ids in groups.items() if len(book_ids) > 1}
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge books sharing an owner and canonical ISBN into the one with the lowest id. '
+        'Run it before migration core.0011, which makes ISBNs unique per owner.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only list the duplicate books.'
+        )
+
+    def handle(self, *args, **options):
+        groups = duplicate_groups()
+        for (user_id, isbn), (keeper, *duplicates) in groups.items():
+            self.stdout.write(f'user {user_id}, ISBN {isbn}: keeping book {keeper}, '
+                              f'merging {", ".join(map(str, duplicates))}')
+        self.stdout.write(f'{len(groups)} ISBN(s) with duplicate books.')
+        if options['check'] or not groups:
+            return
+
+        keeper_of = {}
+        for keeper, *duplicates in groups.values():
+            keeper_of.update((book_id, keeper) for book_id in duplicates)
+
+        with transaction.atomic():
+            BookPublishers = Book.publishers.through
+            BookReviews = Book.reviews.through
+            BookPublishers.objects.bulk_create(
+                [BookPublishers(book_id=keeper_of[book_id], publisher_id=publisher_id)
+                 for book_id, publisher_id in BookPublishers.objects.filter(book_id__in=keeper_of).values_list('book_id', 'publisher_id')],
+                ignore_conflicts=True
+            )
+            BookReviews.objects.bulk_create(
+                [BookReviews(book_id=keeper_of[book_id], review_id=review_id)
+                 for book_id, review_id in BookReviews.objects.filter(book_id__in=keeper_of).values_list('book_id', 'review_id')],
+                ignore_conflicts=True
+            )
+            Book.objects.filter(pk__in=keeper_of).delete()
+
+            for (_, isbn), (keeper, *_) in groups.items():
+                Book.objects.filter(pk=keeper).update(isbn=isbn, updated_at=Now())
+            keepers = Book.objects.filter(pk__in=set(keeper_of.values()))
+            keepers.rebuild_review_stats()
+            keepers.update_search_vector()
+            invalidate_books([*keeper_of, *keeper_of.values()])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {len(keeper_of)} duplicate book(s).'))
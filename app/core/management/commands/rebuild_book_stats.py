@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized review_count and rating aggregates on books.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report books whose aggregates are out of date.'
+        )
+
+    def handle(self, *args, **options):
+        stale = Book.objects.stale_review_stats().count()
+        self.stdout.write(f'{stale} book(s) with stale review aggregates.')
+        if options['check']:
+            return
+
+        updated = Book.objects.rebuild_review_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt review aggregates for {updated} book(s).'))
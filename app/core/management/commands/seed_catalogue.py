@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.seeding import CatalogueGenerator
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic catalogue of users, publishers, books and reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, the same seed yields the same catalogue.')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--publishers', type=int, default=20000)
+        parser.add_argument('--books', type=int, default=1000000)
+        parser.add_argument(
+            '--review-alpha',
+            type=float,
+            default=1.5,
+            help='Pareto shape of reviews per book, lower means a heavier tail.'
+        )
+        parser.add_argument('--max-reviews', type=int, default=500, help='Upper bound of reviews per book.')
+        parser.add_argument('--max-publishers-per-book', type=int, default=3)
+        parser.add_argument('--publisher-skew', type=float, default=1.1, help='Zipf exponent of publisher popularity.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Books inserted per transaction.')
+        parser.add_argument(
+            '--no-search-vector',
+            action='store_true',
+            help='Skip filling Book.search_vector, run update_search_vector later.'
+        )
+
+    def handle(self, *args, **options):
+        generator = CatalogueGenerator(
+            seed=options['seed'],
+            users=options['users'],
+            publishers=options['publishers'],
+            books=options['books'],
+            review_alpha=options['review_alpha'],
+            max_reviews=options['max_reviews'],
+            max_publishers_per_book=options['max_publishers_per_book'],
+            publisher_skew=options['publisher_skew'],
+            batch_size=options['batch_size'],
+            search_vector=not options['no_search_vector'],
+        )
+        start = time.perf_counter()
+
+        def progress(counts):
+            rate = counts['books'] / (time.perf_counter() - start)
+            self.stdout.write(f'{counts["books"]}/{options["books"]} books, {counts["reviews"]} reviews ({rate:.0f} books/s)')
+
+        counts = generator.generate(progress=progress if options['verbosity'] else None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {counts["users"]} user(s), {counts["publishers"]} publisher(s), {counts["books"]} book(s) '
+            f'and {counts["reviews"]} review(s) in {time.perf_counter() - start:.1f}s.'
+        ))
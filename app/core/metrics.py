@@ -0,0 +1,67 @@
+"""Prometheus metrics shared by the middleware and the caches.
+
+When `PROMETHEUS_MULTIPROC_DIR` is set, prometheus_client keeps values in
+per-process files there and `/metrics` merges them, so every gunicorn
+worker is accounted for no matter which one answers the scrape.
+"""
+
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'bookr_http_request_duration_seconds',
+    'Request latency by route and method.',
+    ['route', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'bookr_http_requests_total',
+    'Requests by route, method and status class.',
+    ['route', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'bookr_http_request_queries',
+    'SQL queries issued per request.',
+    ['route', 'method'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+CACHE_REQUESTS = Counter(
+    'bookr_cache_requests_total',
+    'Cache lookups by cache and result.',
+    ['cache', 'result'],
+)
+PASSWORD_HASH_REJECTED = Counter(
+    'bookr_password_hash_rejected_total',
+    'Logins and sign-ups turned away because the hashing pool was full.',
+)
+COMPRESSION_BYTES = Counter(
+    'bookr_compression_bytes_total',
+    'Response bytes before (in) and after (out) compression, by encoding.',
+    ['encoding', 'stage'],
+)
+COMPRESSION_SECONDS = Counter(
+    'bookr_compression_cpu_seconds_total',
+    'CPU time spent compressing responses, by encoding.',
+    ['encoding'],
+)
+
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def compressed(encoding, size_in, size_out, seconds):
+    COMPRESSION_BYTES.labels(encoding, 'in').inc(size_in)
+    COMPRESSION_BYTES.labels(encoding, 'out').inc(size_out)
+    COMPRESSION_SECONDS.labels(encoding).inc(seconds)
+
+
+def render():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry)
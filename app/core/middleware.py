@@ -0,0 +1,289 @@
+import json
+import logging
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware, re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from core import metrics
+from core.profiling import profiling, timed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('core.profiling')
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+
+class RequestProfilingMiddleware:
+    """Report query count, SQL, serialization and view time per request.
+
+    Enabled with `REQUEST_PROFILING['ENABLED']`; otherwise Django drops the
+    middleware at startup. Timings are sent as a `Server-Timing` header and
+    logged as one JSON line; SQL statements repeated at least
+    `DUPLICATE_THRESHOLD` times, the usual sign of an N+1 pattern, are
+    logged as a warning and counted in `X-Duplicate-Queries`.
+
+    Keep it last in `MIDDLEWARE` so `view` covers only the view and the
+    response rendering.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.duplicate_threshold = settings.REQUEST_PROFILING['DUPLICATE_THRESHOLD']
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with self._profiling() as profile:
+            response = self.get_response(request)
+
+        return self._report(request, response, profile)
+
+    async def __acall__(self, request):
+        with self._profiling() as profile:
+            response = await self.get_response(request)
+
+        return self._report(request, response, profile)
+
+    @contextmanager
+    def _profiling(self):
+        with profiling() as profile, ExitStack() as stack:
+            def record(execute, sql, params, many, context):
+                start = time.perf_counter()
+                try:
+                    return execute(sql, params, many, context)
+                finally:
+                    profile.record_query(sql, time.perf_counter() - start)
+
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record))
+            with timed('view'):
+                yield profile
+
+    def _report(self, request, response, profile):
+        duplicates = profile.duplicates(self.duplicate_threshold)
+        timings = {name: round(seconds * 1000, 2) for name, seconds in profile.timings.items()}
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration}' + (f';desc="{profile.query_count} queries"' if name == 'db' else '')
+            for name, duration in sorted(timings.items())
+        )
+        if duplicates:
+            response['X-Duplicate-Queries'] = str(sum(count - 1 for count in duplicates.values()))
+            for sql, count in duplicates.items():
+                logger.warning('Query executed %d times in %s %s: %s', count, request.method, request.path, sql)
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.query_count,
+            'duplicate_queries': sum(duplicates.values()),
+            'timings_ms': timings,
+        }, sort_keys=True))
+
+        return response
+
+
+class MetricsMiddleware:
+    """Record latency, status and query count per route for `/metrics`.
+
+    Routes are labelled with the URL name (e.g. `book:book-list`) so label
+    cardinality stays bounded. Place it first in `MIDDLEWARE`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with self._measuring() as measured:
+            response = self.get_response(request)
+
+        return self._record(request, response, measured)
+
+    async def __acall__(self, request):
+        with self._measuring() as measured:
+            response = await self.get_response(request)
+
+        return self._record(request, response, measured)
+
+    @contextmanager
+    def _measuring(self):
+        measured = SimpleNamespace(queries=0, elapsed=0.0)
+
+        def count(execute, sql, params, many, context):
+            measured.queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            yield measured
+        measured.elapsed = time.perf_counter() - start
+
+    def _record(self, request, response, measured):
+        match = request.resolver_match
+        route = (match.view_name or match.route) if match else 'unmatched'
+        metrics.REQUEST_LATENCY.labels(route, request.method).observe(measured.elapsed)
+        metrics.REQUEST_QUERIES.labels(route, request.method).observe(measured.queries)
+        metrics.REQUESTS.labels(route, request.method, f'{response.status_code // 100}xx').inc()
+
+        return response
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._zlib.compress(data)
+
+    def flush(self):
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._zlib.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, quality):
+        self._brotli = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._brotli.process(data)
+
+    def flush(self):
+        return self._brotli.flush()
+
+    def finish(self):
+        return self._brotli.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """`GZipMiddleware` with a size threshold, brotli and metrics.
+
+    Brotli is preferred when the client accepts it and the `brotli`
+    package is installed. Streaming responses, like the book export, are
+    compressed and flushed chunk by chunk. Routes (URL names) listed in
+    `COMPRESSION['EXCLUDE_ROUTES']` are never compressed. Only the content
+    types in `COMPRESSION['CONTENT_TYPES']` (API JSON and NDJSON by default)
+    are compressed: unlike `GZipMiddleware` there is no gzip filename
+    padding, so HTML with CSRF tokens (admin, browsable API) is left alone
+    rather than exposed to BREACH. Bytes in and out and the CPU time spent
+    are recorded per encoding for `/metrics`.
+    """
+
+    def __init__(self, get_response):
+        config = settings.COMPRESSION
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        self.min_size = config['MIN_SIZE']
+        self.gzip_level = config['GZIP_LEVEL']
+        self.brotli_quality = config['BROTLI_QUALITY']
+        self.exclude_routes = set(config['EXCLUDE_ROUTES'])
+        self.content_types = set(config['CONTENT_TYPES'])
+
+    def compressor(self, request):
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_br.search(accept):
+            return BrotliCompressor(self.brotli_quality)
+        if re_accepts_gzip.search(accept):
+            return GzipCompressor(self.gzip_level)
+
+        return None
+
+    async def __acall__(self, request):
+        # `MiddlewareMixin` would move `process_response` to a thread; it
+        # only compresses bytes already in memory, so keep it on the loop.
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if response.get('Content-Type', '').split(';')[0].strip() not in self.content_types:
+            return response
+        match = request.resolver_match
+        if match is not None and match.view_name in self.exclude_routes:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor = self.compressor(request)
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async_stream(compressor, response.streaming_content)
+            else:
+                response.streaming_content = self._compress_stream(compressor, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            start = time.thread_time()
+            compressed = compressor.compress(response.content) + compressor.finish()
+            metrics.compressed(compressor.encoding, len(response.content), len(compressed), time.thread_time() - start)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag would claim the compressed bytes equal the original ones.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor.encoding
+
+        return response
+
+    def _compress_chunk(self, compressor, chunk, last=False):
+        start = time.thread_time()
+        data = compressor.finish() if last else compressor.compress(chunk) + compressor.flush()
+        metrics.compressed(compressor.encoding, len(chunk), len(data), time.thread_time() - start)
+
+        return data
+
+    def _compress_stream(self, compressor, chunks):
+        for chunk in chunks:
+            yield self._compress_chunk(compressor, chunk)
+        yield self._compress_chunk(compressor, b'', last=True)
+
+    async def _compress_async_stream(self, compressor, chunks):
+        async for chunk in chunks:
+            yield self._compress_chunk(compressor, chunk)
+        yield self._compress_chunk(compressor, b'', last=True)
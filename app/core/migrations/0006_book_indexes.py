@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:05
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_review_book_reviews'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_date', 'id'], name='book_pub_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='text_pattern_ops'), name='book_title_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+
+
+def populate_search_vector(apps, schema_editor):
+    Book = apps.get_model('core', 'Book')
+    Review = apps.get_model('core', 'Review')
+
+    review_text = Review.objects.filter(book=OuterRef('pk')).values('book').annotate(
+        text=StringAgg(Concat('title', Value(' '), 'content', output_field=TextField()), delimiter=' ')
+    ).values('text')
+    Book.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector(Coalesce(Subquery(review_text), Value(''), output_field=TextField()), weight='B', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_book_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='book_search_vector_idx'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:15
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def populate_review_stats(apps, schema_editor):
+    Book = apps.get_model('core', 'Book')
+    Review = apps.get_model('core', 'Review')
+
+    stats = Review.objects.filter(book=OuterRef('pk')).values('book')
+    review_count = Coalesce(Subquery(stats.annotate(value=Count('id')).values('value')), 0)
+    rating_sum = Coalesce(Subquery(stats.annotate(value=Sum('rating')).values('value')), 0)
+    Book.objects.update(
+        review_count=review_count,
+        rating_sum=rating_sum,
+        rating_avg=Coalesce(
+            Cast(rating_sum, FloatField()) / NullIf(review_count, 0),
+            Value(0.0),
+            output_field=FloatField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_book_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['rating_avg', 'id'], name='book_rating_avg_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['review_count', 'id'], name='book_review_count_id_idx'),
+        ),
+        migrations.RunPython(populate_review_stats, migrations.RunPython.noop),
+    ]
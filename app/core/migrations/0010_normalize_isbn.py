@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count
+
+from core.isbn import normalize_isbn
+
+
+def normalize_isbns(apps, schema_editor):
+    Book = apps.get_model('core', 'Book')
+
+    changed = []
+    for book_id, isbn in Book.objects.values_list('id', 'isbn').iterator(chunk_size=5000):
+        normalized = normalize_isbn(isbn)
+        if normalized != isbn:
+            changed.append(Book(id=book_id, isbn=normalized))
+    Book.objects.bulk_update(changed, ['isbn'], batch_size=5000)
+
+
+def check_duplicate_books(apps, schema_editor):
+    """Refuse to continue while 0011's unique constraint would fail.
+
+    Duplicates are merged by `manage.py merge_duplicate_isbns`, which lists
+    every book it deletes, rather than silently here.
+    """
+    Book = apps.get_model('core', 'Book')
+
+    groups = Book.objects.values('user', 'isbn').annotate(books=Count('id')).filter(books__gt=1).order_by('user', 'isbn')
+    conflicts = [f'user {group["user"]}, ISBN {group["isbn"]}: {group["books"]} books' for group in groups[:20]]
+    if conflicts:
+        raise RuntimeError(
+            'Books share an owner and ISBN:\n  ' + '\n  '.join(conflicts)
+            + '\nRun `python manage.py merge_duplicate_isbns` to merge them, then migrate again.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_isbns, migrations.RunPython.noop),
+        migrations.RunPython(check_duplicate_books, migrations.RunPython.noop),
+    ]
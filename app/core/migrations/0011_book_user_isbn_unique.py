@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_normalize_isbn'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(fields=('user', 'isbn'), name='book_user_isbn_unique'),
+        ),
+    ]
@@ -3,7 +3,20 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin)
 
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connections, models
+from django.db.models import (
+    BigIntegerField, Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, TextField, Value, When
+)
+from django.db.models.expressions import CombinedExpression
+from django.db.models.functions import Cast, Coalesce, Concat, Greatest, Now, NullIf, Upper
+
+from core import hashing
+
+SEARCH_CONFIG = 'english'
 
 
 class UserManager(BaseUserManager):
@@ -45,34 +58,273 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def set_password(self, raw_password):
+        """Hash on the hashing pool, keeping `password_changed()` on save."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+
+class ReviewQuerySet(models.QuerySet):
+    def embedded(self):
+        """The capped selection of reviews embedded in book payloads."""
+        return self.order_by(*settings.BOOK_EMBEDDED_REVIEWS_ORDERING)[:settings.BOOK_EMBEDDED_REVIEWS]
+
 
 class Review(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     rating = models.IntegerField()
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ReviewQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
 
+class BookQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        """Rebuild the search document from the title and all review text."""
+        review_text = Review.objects.filter(book=OuterRef('pk')).values('book').annotate(
+            text=StringAgg(Concat('title', Value(' '), 'content', output_field=TextField()), delimiter=' ')
+        ).values('text')
+
+        return self.update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector(Coalesce(Subquery(review_text), Value(''), output_field=TextField()), weight='B', config=SEARCH_CONFIG)
+        ))
+
+    def _append_search_text(self, text):
+        return self.update(search_vector=CombinedExpression(
+            Coalesce(F('search_vector'), SearchVector(Value(''), config=SEARCH_CONFIG)),
+            '||',
+            SearchVector(text, weight='B', config=SEARCH_CONFIG),
+            output_field=SearchVectorField()
+        ))
+
+    def append_review_search_text(self, review):
+        """Add the text of a new review without re-reading older reviews."""
+        return self._append_search_text(Value(f'{review.title} {review.content}'))
+
+    def append_review_search_texts(self, texts):
+        """Add new review text to many books in one statement; `texts` maps book id to text."""
+        return self.filter(pk__in=texts)._append_search_text(
+            _per_book(texts, TextField(), default='')
+        )
+
+    def change_review_stats(self, count, rating):
+        """Atomically shift review_count and rating_sum and refresh rating_avg.
+
+        Pass negative values when reviews are removed. Results are clamped
+        at zero, so drifted aggregates (see `rebuild_book_stats`) cannot
+        fail the `review_count >= 0` check and abort the write.
+        """
+        review_count = Greatest(F('review_count') + count, Value(0))
+        rating_sum = Greatest(F('rating_sum') + rating, Value(0))
+
+        return self.update(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating_avg=_rating_avg(rating_sum, review_count),
+            updated_at=Now()
+        )
+
+    def add_review_stats(self, stats):
+        """Apply `{book_id: (count, rating_sum)}` deltas in one statement."""
+        return self.filter(pk__in=stats).change_review_stats(
+            _per_book({book_id: count for book_id, (count, _) in stats.items()}, IntegerField()),
+            _per_book({book_id: rating for book_id, (_, rating) in stats.items()}, BigIntegerField())
+        )
+
+    def with_actual_review_stats(self):
+        stats = Review.objects.filter(book=OuterRef('pk')).values('book')
+
+        return self.annotate(
+            actual_review_count=Coalesce(Subquery(stats.annotate(value=Count('id')).values('value')), 0),
+            actual_rating_sum=Coalesce(Subquery(stats.annotate(value=Sum('rating')).values('value')), 0),
+        )
+
+    def stale_review_stats(self):
+        """Books whose stored aggregates disagree with their reviews."""
+        return self.with_actual_review_stats().filter(
+            ~Q(review_count=F('actual_review_count')) | ~Q(rating_sum=F('actual_rating_sum'))
+        )
+
+    def upsert(self, user, title, publication_date, isbn):
+        """Create `user`'s book with this ISBN or update it, in one statement.
+
+        Uses `INSERT ... ON CONFLICT (user_id, isbn)`. A row whose title and
+        publication date already match is not rewritten, so retried writes
+        keep `updated_at` and the cached validators intact. Returns
+        `(id, state)` where state is `created`, `updated` or `unchanged`.
+        """
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        sql = f'''
+            WITH upserted AS (
+                INSERT INTO {table} (
+                    user_id, title, publication_date, isbn, search_vector,
+                    review_count, rating_sum, rating_avg, updated_at
+                )
+                VALUES (%s, %s, %s, %s, setweight(to_tsvector(%s::regconfig, %s), 'A'), 0, 0, 0, NOW())
+                ON CONFLICT (user_id, isbn) DO UPDATE
+                    SET title = EXCLUDED.title,
+                        publication_date = EXCLUDED.publication_date,
+                        updated_at = EXCLUDED.updated_at
+                    WHERE ({table}.title, {table}.publication_date)
+                        IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.publication_date)
+                RETURNING id, xmax = 0 AS created
+            )
+            SELECT id, CASE WHEN created THEN 'created' ELSE 'updated' END FROM upserted
+            UNION ALL
+            SELECT id, 'unchanged' FROM {table}
+            WHERE user_id = %s AND isbn = %s AND NOT EXISTS (SELECT 1 FROM upserted)
+        '''
+        params = [user.pk, title, publication_date, isbn, SEARCH_CONFIG, title, user.pk, isbn]
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            # A concurrent insert committed after this statement's snapshot.
+            return self.filter(user=user, isbn=isbn).values_list('id', flat=True).get(), 'unchanged'
+
+        return row
+
+    def insert_new(self, user, books, batch_size=5000):
+        """Insert `user`'s books whose ISBN is not taken yet.
+
+        `books` are `(title, publication_date, isbn)` tuples. Rows are
+        written with `INSERT ... ON CONFLICT (user_id, isbn) DO NOTHING`,
+        so a book created concurrently with the same ISBN is skipped
+        instead of failing the statement. Returns `{isbn: id}` for the
+        inserted books.
+        """
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        books = list(books)
+        inserted = {}
+        with connections[self.db].cursor() as cursor:
+            for start in range(0, len(books), batch_size):
+                batch = books[start:start + batch_size]
+                values = ', '.join(['(%s, %s, %s, %s, 0, 0, 0, NOW())'] * len(batch))
+                cursor.execute(f'''
+                    INSERT INTO {table} (
+                        user_id, title, publication_date, isbn, review_count, rating_sum, rating_avg, updated_at
+                    )
+                    VALUES {values}
+                    ON CONFLICT (user_id, isbn) DO NOTHING
+                    RETURNING isbn, id
+                ''', [value for book in batch for value in (user.pk, *book)])
+                inserted.update(cursor.fetchall())
+
+        return inserted
+
+    def rebuild_review_stats(self):
+        """Recompute the aggregates from scratch."""
+        stats = Review.objects.filter(book=OuterRef('pk')).values('book')
+        review_count = Coalesce(Subquery(stats.annotate(value=Count('id')).values('value')), 0)
+        rating_sum = Coalesce(Subquery(stats.annotate(value=Sum('rating')).values('value')), 0)
+
+        return self.update(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating_avg=_rating_avg(rating_sum, review_count)
+        )
+
+
+def _per_book(values, output_field, default=0):
+    """A CASE expression picking each book's value from `{book_id: value}`."""
+    return Case(
+        *(When(pk=book_id, then=Value(value)) for book_id, value in values.items()),
+        default=Value(default),
+        output_field=output_field
+    )
+
+
+def _rating_avg(rating_sum, review_count):
+    return Coalesce(
+        Cast(rating_sum, FloatField()) / NullIf(review_count, 0),
+        Value(0.0),
+        output_field=FloatField()
+    )
+
+
 class Book(models.Model):
     title = models.CharField(max_length=255)
     publication_date = models.DateField()
-    isbn = models.CharField(max_length=255)
+    isbn = models.CharField(max_length=255, db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     publishers = models.ManyToManyField('Publisher')
     reviews = models.ManyToManyField('Review')
+    search_vector = SearchVectorField(null=True, editable=False)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='book_search_vector_idx'),
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            models.Index(fields=['publication_date', 'id'], name='book_pub_date_id_idx'),
+            models.Index(fields=['rating_avg', 'id'], name='book_rating_avg_id_idx'),
+            models.Index(fields=['review_count', 'id'], name='book_review_count_id_idx'),
+            # `title` filters compare UPPER(title) with LIKE 'prefix%'.
+            models.Index(OpClass(Upper('title'), name='text_pattern_ops'), name='book_title_prefix_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'isbn'], name='book_user_isbn_unique'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def embedded_reviews(self):
+        if hasattr(self, '_embedded_reviews'):
+            return self._embedded_reviews
+
+        return self.reviews.embedded()
+
+
+class PublisherManager(models.Manager):
+    def get_or_create_many(self, user, publishers):
+        """Resolve many publisher payloads for a user in one lookup.
+
+        Publishers are matched on all of their fields, the same way
+        `get_or_create` does it. Missing ones are inserted with a single
+        `bulk_create`. Returns a dict keyed by `(name, website, email)`.
+        """
+        keys = {(p['name'], p['website'], p['email']) for p in publishers}
+        if not keys:
+            return {}
+
+        found = {}
+        existing = self.filter(user=user, name__in={key[0] for key in keys}).order_by('id')
+        for publisher in existing:
+            key = (publisher.name, publisher.website, publisher.email)
+            if key in keys:
+                found.setdefault(key, publisher)
+
+        missing = [
+            self.model(user=user, name=name, website=website, email=email)
+            for name, website, email in keys - found.keys()
+        ]
+        for publisher in self.bulk_create(missing):
+            found[(publisher.name, publisher.website, publisher.email)] = publisher
+
+        return found
+
 
 class Publisher(models.Model):
     name = models.CharField(max_length=255)
     website = models.URLField(max_length=255)
     email = models.EmailField(max_length=255)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PublisherManager()
 
     def __str__(self):
         return self.name
@@ -0,0 +1,71 @@
+"""Per-request timing collected by `core.middleware.RequestProfilingMiddleware`.
+
+The middleware stores a `RequestProfile` in a context variable for the
+duration of a request; code can attribute time to a phase with
+`timed('phase')`. Nested uses of the same phase are counted once. Without
+an active profile every helper here is a no-op.
+"""
+
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.queries = Counter()
+        self.query_count = 0
+        self._active = set()
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.queries[sql] += 1
+        self.timings['db'] += duration
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.queries.items() if count >= threshold}
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def profiling():
+    profile = RequestProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    profile = _current.get()
+    if profile is None or name in profile._active:
+        yield
+        return
+
+    profile._active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.timings[name] += time.perf_counter() - start
+        profile._active.discard(name)
+
+
+class TimedRepresentationMixin:
+    """Attribute a serializer's `to_representation` to the `serialize` phase."""
+
+    def to_representation(self, instance):
+        if _current.get() is None:
+            return super().to_representation(instance)
+
+        with timed('serialize'):
+            return super().to_representation(instance)
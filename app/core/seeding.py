@@ -0,0 +1,152 @@
+"""Deterministic synthetic catalogue for load tests and local profiling.
+
+Books are generated in batches: each batch is inserted with `bulk_create`,
+its reviews follow, and the rows for the `Book.publishers` and
+`Book.reviews` through tables are streamed with PostgreSQL `COPY`. Review
+counts per book follow a power law and publishers are picked with Zipf
+weights, so a few books and publishers dominate like in production. The
+denormalized review aggregates are computed while generating, no rebuild
+pass is needed.
+"""
+
+import datetime
+import itertools
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from core.db import copy_rows
+from core.isbn import isbn13_check_digit
+from core.models import Book, Publisher, Review
+
+WORDS = [
+    'river', 'shadow', 'garden', 'empire', 'winter', 'machine', 'ocean', 'letters', 'silver', 'night',
+    'house', 'storm', 'island', 'glass', 'forest', 'crown', 'signal', 'harbor', 'mirror', 'stone',
+    'summer', 'engine', 'paper', 'wolf', 'orchard', 'lantern', 'north', 'city', 'memory', 'iron',
+]
+EPOCH = datetime.date(1950, 1, 1)
+
+
+def isbn13(number):
+    """Return a valid ISBN-13 for `number`, unique per number."""
+    digits = f'978{number:09d}'
+
+    return digits + isbn13_check_digit(digits)
+
+
+class CatalogueGenerator:
+    def __init__(self, seed=0, users=100, publishers=1000, books=10000, review_alpha=1.5, max_reviews=500,
+                 max_publishers_per_book=3, publisher_skew=1.1, batch_size=5000, search_vector=True):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.users = users
+        self.publishers = publishers
+        self.books = books
+        self.review_alpha = review_alpha
+        self.max_reviews = max_reviews
+        self.max_publishers_per_book = max_publishers_per_book
+        self.batch_size = batch_size
+        self.search_vector = search_vector
+        self.publisher_weights = list(itertools.accumulate(1 / (rank + 1) ** publisher_skew for rank in range(publishers)))
+        self.counts = {'users': 0, 'publishers': 0, 'books': 0, 'reviews': 0}
+        self.user_ids = []
+
+    def _review_count(self):
+        # Discrete Pareto: most books get a handful of reviews, a few get hundreds.
+        return min(int(self.rng.paretovariate(self.review_alpha)) - 1, self.max_reviews)
+
+    def _title(self, words):
+        return ' '.join(self.rng.sample(WORDS, words)).title()
+
+    def create_users(self):
+        """Create the seed users, reusing those left by an earlier run."""
+        user_model = get_user_model()
+        emails = [f'seed{self.seed}-{i}@example.com' for i in range(self.users)]
+        existing = dict(user_model.objects.filter(email__in=emails).values_list('email', 'id'))
+        password = make_password('seed-password')
+        created = user_model.objects.bulk_create(
+            (user_model(email=email, name=f'Seed User {i}', password=password)
+             for i, email in enumerate(emails) if email not in existing),
+            batch_size=self.batch_size
+        )
+        existing.update((user.email, user.id) for user in created)
+        self.counts['users'] = len(created)
+
+        return [existing[email] for email in emails]
+
+    def create_publishers(self, user_ids):
+        publishers = Publisher.objects.bulk_create(
+            (Publisher(
+                user_id=self.rng.choice(user_ids),
+                name=f'{self._title(2)} Press {i}',
+                website=f'https://publisher{i}.example.com',
+                email=f'contact@publisher{i}.example.com'
+            ) for i in range(self.publishers)),
+            batch_size=self.batch_size
+        )
+        self.counts['publishers'] = len(publishers)
+
+        return [publisher.id for publisher in publishers]
+
+    def _create_batch(self, start, size, user_ids, publisher_ids):
+        ratings = [[self.rng.randint(1, 10) for _ in range(self._review_count())] for _ in range(size)]
+        books = Book.objects.bulk_create(
+            Book(
+                user_id=self.rng.choice(user_ids),
+                title=self._title(self.rng.randint(1, 4)),
+                publication_date=EPOCH + datetime.timedelta(days=self.rng.randrange(27000)),
+                isbn=isbn13(start + i),
+                review_count=len(book_ratings),
+                rating_sum=sum(book_ratings),
+                rating_avg=sum(book_ratings) / len(book_ratings) if book_ratings else 0.0
+            ) for i, book_ratings in enumerate(ratings)
+        )
+        reviews = Review.objects.bulk_create(
+            Review(
+                user_id=self.rng.choice(user_ids),
+                title=self._title(2),
+                content=' '.join(self.rng.choices(WORDS, k=self.rng.randint(10, 60))),
+                rating=rating
+            ) for book_ratings in ratings for rating in book_ratings
+        )
+
+        book_publishers = []
+        for book in books:
+            picked = self.rng.choices(
+                publisher_ids,
+                cum_weights=self.publisher_weights,
+                k=self.rng.randint(1, self.max_publishers_per_book)
+            )
+            book_publishers.extend((book.id, publisher_id) for publisher_id in dict.fromkeys(picked))
+        copy_rows(Book.publishers.through, ('book_id', 'publisher_id'), book_publishers)
+
+        review_ids = iter(review.id for review in reviews)
+        copy_rows(
+            Book.reviews.through,
+            ('book_id', 'review_id'),
+            ((book.id, next(review_ids)) for book, book_ratings in zip(books, ratings) for _ in book_ratings)
+        )
+
+        if self.search_vector:
+            Book.objects.filter(pk__in=[book.id for book in books]).update_search_vector()
+
+        self.counts['books'] += len(books)
+        self.counts['reviews'] += len(reviews)
+
+    def generate(self, progress=None):
+        """Insert the whole catalogue, one transaction per batch of books."""
+        with transaction.atomic():
+            user_ids = self.user_ids = self.create_users()
+            publisher_ids = self.create_publishers(user_ids)
+        # ISBNs continue after the books already present so reruns stay unique.
+        offset = Book.objects.count()
+
+        for start in range(0, self.books, self.batch_size):
+            with transaction.atomic():
+                self._create_batch(offset + start, min(self.batch_size, self.books - start), user_ids, publisher_ids)
+            if progress is not None:
+                progress(self.counts)
+
+        return self.counts
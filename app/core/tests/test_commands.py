@@ -0,0 +1,187 @@
+"""Test management commands."""
+
+import itertools
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import Book, Publisher, Review
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'test@example.com',
+        'name': 'test',
+        'password': 'test123'
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+ISBNS = itertools.count(1)
+
+
+def create_book(user, **params):
+    defaults = {
+        'title': 'Book',
+        'publication_date': '2023-01-01',
+        'isbn': f'{next(ISBNS):09d}'
+    }
+    defaults.update(params)
+    return Book.objects.create(user=user, **defaults)
+
+
+class RebuildBookStatsTest(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user()
+        self.book = create_book(user=self.user)
+        for rating in (2, 3, 7):
+            review = Review.objects.create(title='Review', content='Content', rating=rating, user=self.user)
+            self.book.reviews.add(review)
+
+    def test_check_reports_without_writing(self):
+        out = StringIO()
+        call_command('rebuild_book_stats', '--check', stdout=out)
+
+        self.assertIn('1 book(s) with stale review aggregates', out.getvalue())
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.review_count, 0)
+
+    def test_rebuild(self):
+        create_book(user=self.user, title='No reviews')
+
+        call_command('rebuild_book_stats', stdout=StringIO())
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.review_count, 3)
+        self.assertEqual(self.book.rating_sum, 12)
+        self.assertEqual(self.book.rating_avg, 4.0)
+        self.assertFalse(Book.objects.stale_review_stats().exists())
+        self.assertEqual(Book.objects.get(title='No reviews').rating_avg, 0)
+
+
+class MergeDuplicateIsbnsTest(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user()
+        # Rows written before ISBNs were normalized: distinct strings, same book.
+        self.keeper = create_book(user=self.user, isbn='0-306-40615-2')
+        self.duplicate = create_book(user=self.user, isbn='9780306406157')
+        self.other = create_book(user=create_user(email='other@example.com'), isbn='9780306406157')
+        for book, rating in ((self.keeper, 2), (self.duplicate, 6)):
+            review = Review.objects.create(title='Review', content='Content', rating=rating, user=self.user)
+            book.reviews.add(review)
+        publisher = Publisher.objects.create(name='P', website='https://p.com', email='p@p.com', user=self.user)
+        self.duplicate.publishers.add(publisher)
+
+    def test_check_lists_without_writing(self):
+        out = StringIO()
+        call_command('merge_duplicate_isbns', '--check', stdout=out)
+
+        self.assertIn(f'ISBN 9780306406157: keeping book {self.keeper.id}, merging {self.duplicate.id}', out.getvalue())
+        self.assertIn('1 ISBN(s) with duplicate books', out.getvalue())
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_merge(self):
+        out = StringIO()
+        call_command('merge_duplicate_isbns', stdout=out)
+
+        self.assertIn('Deleted 1 duplicate book(s)', out.getvalue())
+        self.assertFalse(Book.objects.filter(pk=self.duplicate.id).exists())
+        self.assertTrue(Book.objects.filter(pk=self.other.id).exists())
+        self.keeper.refresh_from_db()
+        self.assertEqual(self.keeper.isbn, '9780306406157')
+        self.assertEqual(self.keeper.reviews.count(), 2)
+        self.assertEqual(self.keeper.publishers.count(), 1)
+        self.assertEqual(self.keeper.review_count, 2)
+        self.assertEqual(self.keeper.rating_sum, 8)
+
+
+class BenchmarkApiTest(TestCase):
+    def test_report(self):
+        out = StringIO()
+        call_command(
+            'benchmark_api',
+            '--use-current-db',
+            users=2,
+            publishers=2,
+            books=10,
+            review_alpha=1.2,
+            requests=4,
+            warmup=1,
+            concurrency=1,
+            endpoint=['book_list', 'book_detail'],
+            stdout=out
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(Book.objects.count(), 10)
+        self.assertEqual(Review.objects.count(), report['config']['reviews'])
+        self.assertEqual(set(report['endpoints']), {'book_list', 'book_detail'})
+        for result in report['endpoints'].values():
+            self.assertEqual(result['requests'], 4)
+            self.assertEqual(result['errors'], 0)
+            self.assertIn('queries_mean', result)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+
+class BenchmarkSerializersTest(TestCase):
+    def test_report(self):
+        out = StringIO()
+        call_command('benchmark_serializers', '--use-current-db', rows=[5, 20], repeat=1, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['results']), {'5', '20'})
+        for result in report['results'].values():
+            self.assertTrue(result['identical'])
+            self.assertIn('serialize_ms', result['fast'])
+            self.assertIn('serialize_ms', result['drf'])
+
+
+class BenchmarkJsonTest(TestCase):
+    def test_report(self):
+        out = StringIO()
+        call_command('benchmark_json', size=[5], repeat=2, stdout=out)
+
+        result = json.loads(out.getvalue())['results']['5']
+        self.assertTrue(result['identical'])
+        for backend in ['stdlib', 'orjson']:
+            self.assertGreater(result[backend]['bytes'], 0)
+            self.assertIn('encode_peak_kib', result[backend])
+
+
+class SeedCatalogueTest(TestCase):
+    def _seed(self, seed):
+        call_command('seed_catalogue', seed=seed, users=3, publishers=5, books=40, batch_size=15, stdout=StringIO())
+
+        return list(Book.objects.order_by('id').values_list('title', 'isbn', 'review_count', 'rating_sum'))
+
+    def test_deterministic(self):
+        first = self._seed(1)
+        Book.objects.all().delete()
+        Review.objects.all().delete()
+
+        second = self._seed(1)
+
+        self.assertEqual(len(first), 40)
+        self.assertEqual([row[0] for row in first], [row[0] for row in second])
+        self.assertEqual([row[2:] for row in first], [row[2:] for row in second])
+
+    def test_relations_and_aggregates(self):
+        self._seed(2)
+
+        self.assertFalse(Book.objects.stale_review_stats().exists())
+        self.assertEqual(Review.objects.count(), Book.reviews.through.objects.count())
+        self.assertFalse(Book.objects.filter(publishers=None).exists())
+        self.assertFalse(Book.objects.filter(search_vector=None).exists())
+        self.assertEqual(len(set(Book.objects.values_list('isbn', flat=True))), 40)
+
+    def test_rerun_adds_unique_isbns(self):
+        self._seed(3)
+        self._seed(3)
+
+        self.assertEqual(Book.objects.count(), 80)
+        self.assertEqual(len(set(Book.objects.values_list('isbn', flat=True))), 80)
+        self.assertEqual(get_user_model().objects.filter(email__startswith='seed3-').count(), 3)
@@ -0,0 +1,19 @@
+from django.test import SimpleTestCase
+
+from core.isbn import isbn10_is_valid, normalize_isbn
+
+
+class NormalizeIsbnTest(SimpleTestCase):
+    def test_isbn10_converted_to_isbn13(self):
+        self.assertEqual(normalize_isbn('0-306-40615-2'), '9780306406157')
+        self.assertEqual(normalize_isbn('080442957x'), '9780804429573')
+
+    def test_separators_removed(self):
+        self.assertEqual(normalize_isbn(' 978-0 306-40615-7 '), '9780306406157')
+
+    def test_invalid_isbn10_kept(self):
+        self.assertFalse(isbn10_is_valid('0306406153'))
+        self.assertEqual(normalize_isbn('0306406153'), '0306406153')
+
+    def test_other_values_kept(self):
+        self.assertEqual(normalize_isbn('123'), '123')
@@ -0,0 +1,78 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+
+METRICS_URL = reverse('metrics')
+BOOK_URL = reverse('book:book-list')
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=create_user())
+
+    def test_request_metrics_recorded(self):
+        labels = {'route': 'book:book-list', 'method': 'GET'}
+        before = sample('bookr_http_request_duration_seconds_count', **labels)
+        ok_before = sample('bookr_http_requests_total', status='2xx', **labels)
+
+        self.client.get(BOOK_URL)
+
+        self.assertEqual(sample('bookr_http_request_duration_seconds_count', **labels), before + 1)
+        self.assertEqual(sample('bookr_http_requests_total', status='2xx', **labels), ok_before + 1)
+        self.assertGreater(sample('bookr_http_request_queries_sum', **labels), 0)
+
+    def test_errors_counted_by_status_class(self):
+        labels = {'route': 'book:book-detail', 'method': 'GET', 'status': '4xx'}
+        before = sample('bookr_http_requests_total', **labels)
+
+        self.client.get(reverse('book:book-detail', args=[0]))
+
+        self.assertEqual(sample('bookr_http_requests_total', **labels), before + 1)
+
+    def test_cache_lookups_counted(self):
+        hits = sample('bookr_cache_requests_total', cache='book_response', result='hit')
+
+        self.client.get(BOOK_URL)
+        self.client.get(BOOK_URL)
+
+        self.assertEqual(sample('bookr_cache_requests_total', cache='book_response', result='hit'), hits + 1)
+
+    def test_endpoint_exports_metrics(self):
+        self.client.get(BOOK_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b'bookr_http_request_duration_seconds_bucket', res.content)
+        self.assertIn(b'route="book:book-list"', res.content)
+
+    @override_settings(METRICS={'ENABLED': True, 'TOKEN': 'secret'})
+    def test_endpoint_token(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(res.status_code, 200)
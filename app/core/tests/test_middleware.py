@@ -0,0 +1,209 @@
+"""Tests for the request profiling, metrics and compression middleware."""
+
+import gzip
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from core.middleware import brotli
+from core.models import Book
+
+
+def n_plus_one(request):
+    for book in Book.objects.all():
+        book.publishers.count()
+    return HttpResponse('ok')
+
+
+PAYLOAD = b'{"title": "Book", "reviews": []}' * 100
+
+
+def large(request):
+    response = HttpResponse(PAYLOAD, content_type='application/json')
+    response['ETag'] = '"abc"'
+    return response
+
+
+def page(request):
+    return HttpResponse(b'<input name="csrfmiddlewaretoken" value="secret">' * 100, content_type='text/html; charset=utf-8')
+
+
+def small(request):
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+async def large_async(request):
+    return HttpResponse(PAYLOAD, content_type='application/json')
+
+
+def stream(request):
+    return StreamingHttpResponse((PAYLOAD for _ in range(3)), content_type='application/x-ndjson')
+
+
+urlpatterns = [
+    path('n-plus-one/', n_plus_one),
+    path('large/', large, name='large'),
+    path('small/', small),
+    path('page/', page),
+    path('stream/', stream),
+    path('large-async/', large_async, name='large-async'),
+]
+
+PROFILING = {'ENABLED': True, 'DUPLICATE_THRESHOLD': 2}
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'user@example.com',
+        'name': 'User',
+        'password': 'userpass123'
+    }
+
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_book(user, **params):
+    defaults = {
+        'title': 'Book',
+        'publication_date': '2023-01-01',
+        'isbn': '123123123'
+    }
+    defaults.update(params)
+    return Book.objects.create(user=user, **defaults)
+
+
+@override_settings(REQUEST_PROFILING=PROFILING, BOOK_CACHE_TIMEOUT=0)
+class RequestProfilingMiddlewareTest(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        create_book(user=self.user)
+
+        with self.assertLogs('core.profiling', 'INFO') as logs:
+            res = self.client.get('/api/book/books/')
+
+        timing = res['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('view;dur=', timing)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['path'], '/api/book/books/')
+        self.assertEqual(record['status'], 200)
+        self.assertIn(f'desc="{record["queries"]} queries"', timing)
+        self.assertNotIn('X-Duplicate-Queries', res)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_duplicate_queries_flagged(self):
+        for i in range(3):
+            create_book(user=self.user, isbn=str(i))
+
+        with self.assertLogs('core.profiling', 'INFO') as logs:
+            res = self.client.get('/n-plus-one/')
+
+        self.assertEqual(res['X-Duplicate-Queries'], '2')
+        warnings = [record for record in logs.records if record.levelname == 'WARNING']
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('executed 3 times', warnings[0].getMessage())
+
+
+@override_settings(REQUEST_PROFILING={**PROFILING, 'ENABLED': False})
+class RequestProfilingDisabledTest(TestCase):
+    def test_no_headers(self):
+        client = APIClient()
+        client.force_authenticate(user=create_user())
+
+        res = client.get('/api/book/books/')
+
+        self.assertNotIn('Server-Timing', res)
+
+
+COMPRESSION = {
+    'ENABLED': True, 'MIN_SIZE': 1024, 'GZIP_LEVEL': 6, 'BROTLI_QUALITY': 4, 'EXCLUDE_ROUTES': [],
+    'CONTENT_TYPES': ['application/json', 'application/x-ndjson'],
+}
+
+
+def compression_sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(ROOT_URLCONF=__name__, COMPRESSION=COMPRESSION)
+class CompressionMiddlewareTest(SimpleTestCase):
+    def test_gzip(self):
+        before = compression_sample('bookr_compression_bytes_total', encoding='gzip', stage='in')
+
+        res = self.client.get('/large/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(res['Vary'], 'Accept-Encoding')
+        self.assertEqual(res['ETag'], 'W/"abc"')
+        self.assertEqual(gzip.decompress(res.content), PAYLOAD)
+        self.assertEqual(int(res['Content-Length']), len(res.content))
+        after = compression_sample('bookr_compression_bytes_total', encoding='gzip', stage='in')
+        self.assertEqual(after - before, len(PAYLOAD))
+
+    def test_brotli_preferred(self):
+        if brotli is None:
+            self.skipTest('brotli is not installed')
+
+        res = self.client.get('/large/', HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(res['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(res.content), PAYLOAD)
+
+    def test_below_threshold(self):
+        res = self.client.get('/small/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertNotIn('Content-Encoding', res)
+
+    def test_not_accepted(self):
+        res = self.client.get('/large/')
+
+        self.assertNotIn('Content-Encoding', res)
+        self.assertEqual(res.content, PAYLOAD)
+
+    def test_streaming(self):
+        res = self.client.get('/stream/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(res.streaming_content)), PAYLOAD * 3)
+
+    def test_html_not_compressed(self):
+        res = self.client.get('/page/', HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertNotIn('Content-Encoding', res)
+
+    @override_settings(COMPRESSION={**COMPRESSION, 'EXCLUDE_ROUTES': ['large']})
+    def test_excluded_route(self):
+        res = self.client.get('/large/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertNotIn('Content-Encoding', res)
+
+
+@override_settings(ROOT_URLCONF=__name__, COMPRESSION=COMPRESSION, REQUEST_PROFILING=PROFILING)
+class AsyncMiddlewareTest(SimpleTestCase):
+    def test_chain_not_adapted_under_asgi(self):
+        """With DEBUG on, Django logs every middleware it has to adapt."""
+        with self.settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    async def test_async_request(self):
+        labels = {'route': 'large-async', 'method': 'GET', 'status': '2xx'}
+        before = REGISTRY.get_sample_value('bookr_http_requests_total', labels) or 0
+
+        with self.assertLogs('core.profiling', 'INFO'):
+            res = await self.async_client.get('/large-async/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertIn('view;dur=', res['Server-Timing'])
+        self.assertEqual(gzip.decompress(res.content), PAYLOAD)
+        self.assertEqual(REGISTRY.get_sample_value('bookr_http_requests_total', labels) - before, 1)
@@ -0,0 +1,67 @@
+import datetime
+import decimal
+import io
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONParser, ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def assertRendersLikeStdlib(self, data, **kwargs):
+        self.assertEqual(ORJSONRenderer().render(data, **kwargs), JSONRenderer().render(data, **kwargs))
+
+    def test_book_payload(self):
+        self.assertRendersLikeStdlib({
+            'results': [{
+                'id': 1,
+                'title': 'Zażółć "gęślą"',
+                'publication_date': datetime.date(2023, 1, 31),
+                'publishers': [],
+                'rating_avg': 7.333333333333333,
+            }],
+            'previous': None,
+        })
+
+    def test_special_types(self):
+        self.assertRendersLikeStdlib({
+            'price': decimal.Decimal('12.50'),
+            'key': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'at': datetime.datetime(2023, 1, 1, 12, 30, tzinfo=timezone.utc),
+            'took': datetime.timedelta(seconds=90),
+            'label': gettext_lazy('Book'),
+            'line': 'a\u2028b\u2029c',
+            3: 'int key',
+        })
+
+    def test_indent(self):
+        self.assertRendersLikeStdlib({'a': [1, 2]}, accepted_media_type='application/json; indent=2')
+        self.assertRendersLikeStdlib({'a': [1, 2]}, accepted_media_type='application/json; indent=4')
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def test_parse(self):
+        body = b'{"title": "Dune", "publishers": [{"name": "Ace"}], "rating": 1.5}'
+
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid(self):
+        for body in [b'{"title": ', b'{"rating": NaN}']:
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
+
+    def test_other_encoding(self):
+        body = '{"title": "Zażółć"}'.encode('utf-16')
+
+        data = ORJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'utf-16'})
+
+        self.assertEqual(data, {'title': 'Zażółć'})
@@ -0,0 +1,16 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from core import metrics as metrics_registry
+
+
+def metrics(request):
+    """Prometheus scrape endpoint, guarded by `METRICS['TOKEN']` when set."""
+    token = settings.METRICS['TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+
+    return HttpResponse(metrics_registry.render(), content_type=CONTENT_TYPE_LATEST)
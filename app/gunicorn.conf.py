@@ -0,0 +1,41 @@
+"""Gunicorn configuration, see README.md for the environment variables.
+
+Run the WSGI app with `gunicorn -c gunicorn.conf.py app.wsgi:application`,
+or the ASGI app with `GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker`
+and `app.asgi:application`.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+# Sync workers are killed mid-response past the timeout. Serve the export
+# and import routes from a separate pool with a longer one (README.md).
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically so slow leaks cannot accumulate.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+reload = os.environ.get('GUNICORN_RELOAD', '').lower() in ('1', 'true', 'yes', 'on')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+
+
+# Prometheus multiprocess mode, see core/metrics.py.
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,156 @@
+"""Token authentication backed by an in-process LRU cache.
+
+Resolved `(user, token)` pairs are kept for `TOKEN_AUTH_CACHE['TTL']`
+seconds so steady traffic does not hit the database on every request.
+When `SHARED_CACHE_ALIAS` is set, entries are also stored in that Django
+cache so a fresh worker can skip the database as well. Entries are
+dropped when a token is deleted or rotated and whenever its user is saved
+(see `user.signals`); other workers catch up within the TTL. Every hit
+returns its own copy of the user and token, so a request that changes
+`request.user` does not leak into concurrent requests.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import authentication, exceptions
+from rest_framework.authtoken.models import Token
+
+from core import metrics
+
+stats = {'hits': 0, 'misses': 0}
+
+
+class TokenCache:
+    def __init__(self, max_size, ttl, shared_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_alias = shared_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    @staticmethod
+    def _copy(value):
+        user, token = value
+        user, token = copy.copy(user), copy.copy(token)
+        token.user = user
+
+        return user, token
+
+    @staticmethod
+    def _shared_key(key):
+        return f'auth:token:{key}'
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return self._copy(value)
+                del self._entries[key]
+
+        if self.shared is not None:
+            value = self.shared.get(self._shared_key(key))
+            if value is not None:
+                self._store(key, value)
+                return self._copy(value)
+
+        return None
+
+    def set(self, key, value):
+        value = self._copy(value)
+        self._store(key, value)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), value, self.ttl)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete_many([self._shared_key(key) for key in keys])
+
+    def delete_user(self, user_id):
+        with self._lock:
+            keys = [key for key, ((user, _), _) in self._entries.items() if user.pk == user_id]
+        keys += list(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+        if keys:
+            self.delete(*keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_AUTH_CACHE['MAX_SIZE'],
+    ttl=settings.TOKEN_AUTH_CACHE['TTL'],
+    shared_alias=settings.TOKEN_AUTH_CACHE['SHARED_CACHE_ALIAS'],
+)
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            stats['hits'] += 1
+            metrics.cache_lookup('token_auth', hit=True)
+            return cached
+
+        stats['misses'] += 1
+        metrics.cache_lookup('token_auth', hit=False)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (user, token))
+
+        return user, token
+
+    async def aauthenticate(self, request):
+        """Async `authenticate` for plain Django async views.
+
+        Cache hits are answered without leaving the event loop; misses are
+        resolved through the async ORM.
+        """
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain invalid characters.')
+
+        cached = token_cache.get(key)
+        if cached is not None:
+            stats['hits'] += 1
+            metrics.cache_lookup('token_auth', hit=True)
+            return cached
+
+        stats['misses'] += 1
+        metrics.cache_lookup('token_auth', hit=False)
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        token_cache.set(key, (token.user, token))
+
+        return token.user, token
@@ -0,0 +1,90 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import User
+
+from user.authentication import CachedTokenAuthentication, token_cache
+
+
+ME_URL = reverse('user:me')
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'test@example.com',
+        'name': 'Test User',
+        'password': 'testpass123'
+    }
+
+    defaults.update(params)
+    return User.objects.create_user(**defaults)
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self) -> None:
+        token_cache.clear()
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_is_cached(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_cached_user_is_not_shared(self):
+        authentication = CachedTokenAuthentication()
+        user, token = authentication.authenticate_credentials(self.token.key)
+        user.name = 'Changed in one request'
+
+        cached, cached_token = authentication.authenticate_credentials(self.token.key)
+
+        self.assertIsNot(cached, user)
+        self.assertEqual(cached.name, 'Test User')
+        self.assertIs(cached_token.user, cached)
+
+    def test_deleted_token_rejected(self):
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_refreshes_cached_user(self):
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {'name': 'Updated'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        User.objects.filter(pk=self.user.pk).update(name='Changed elsewhere')
+        self.user.refresh_from_db()
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Changed elsewhere')
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,118 @@
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import hashing
+from core.models import User
+
+
+TOKEN_URL = reverse('user:token')
+
+HASHING = {'ITERATIONS': 1000, 'WORKERS': 2, 'QUEUE_SIZE': 2, 'TIMEOUT': 5}
+
+
+def create_user(**params):
+    defaults = {
+        'email': 'test@example.com',
+        'name': 'Test User',
+        'password': 'testpass123'
+    }
+
+    defaults.update(params)
+    return User.objects.create_user(**defaults)
+
+
+def iterations(user):
+    return int(user.password.split('$')[1])
+
+
+@override_settings(PASSWORD_HASHING=HASHING)
+class PasswordHashingTest(TestCase):
+    def setUp(self) -> None:
+        hashing.shutdown()
+        self.client = APIClient()
+        self.payload = {'email': 'test@example.com', 'password': 'testpass123'}
+
+    def tearDown(self) -> None:
+        hashing.shutdown()
+
+    def test_create_user_uses_configured_cost(self):
+        user = create_user()
+
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_password('testpass123'))
+
+    def test_password_changes_notify_validators(self):
+        with mock.patch('django.contrib.auth.password_validation.password_changed') as password_changed:
+            user = create_user()
+            password_changed.assert_called_once_with('testpass123', user)
+
+            self.client.force_authenticate(user=user)
+            self.client.patch(reverse('user:me'), {'password': 'newpass123'}, format='json')
+
+        self.assertEqual(password_changed.call_count, 2)
+        self.assertEqual(password_changed.call_args.args[0], 'newpass123')
+
+    def test_login_rehashes_with_new_cost(self):
+        user = create_user()
+
+        with override_settings(PASSWORD_HASHING={**HASHING, 'ITERATIONS': 2000}):
+            res = self.client.post(TOKEN_URL, self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual(iterations(user), 2000)
+
+    def test_failed_login_keeps_hash(self):
+        user = create_user()
+        encoded = user.password
+
+        with override_settings(PASSWORD_HASHING={**HASHING, 'ITERATIONS': 2000}):
+            res = self.client.post(TOKEN_URL, {**self.payload, 'password': 'wrong'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        user.refresh_from_db()
+        self.assertEqual(user.password, encoded)
+
+    def test_inactive_user_rejected(self):
+        user = create_user()
+        user.is_active = False
+        user.save()
+
+        res = self.client.post(TOKEN_URL, self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_saturated_pool_returns_503(self):
+        create_user()
+
+        with mock.patch('core.hashing.submit', side_effect=hashing.HashingBusy):
+            res = self.client.post(TOKEN_URL, self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('message', res.data)
+        self.assertEqual(res['Retry-After'], '1')
+
+    @override_settings(PASSWORD_HASHING={**HASHING, 'WORKERS': 1, 'QUEUE_SIZE': 0, 'TIMEOUT': 0})
+    def test_submit_bounded(self):
+        release = threading.Event()
+        future = hashing.submit(release.wait)
+
+        with self.assertRaises(hashing.HashingBusy):
+            hashing.submit(release.wait)
+
+        release.set()
+        self.assertTrue(future.result())
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_password_hashing', iterations=[1000], logins=4, concurrency=2, stdout=out)
+
+        self.assertIn('mode=inline', out.getvalue())
+        self.assertIn('mode=pool', out.getvalue())
@@ -1,25 +1,44 @@
 from rest_framework import (
     generics,
     permissions,
-    authentication
+    status
 )
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 
+from core.hashing import HashingBusy
+from user.authentication import CachedTokenAuthentication
 from user.serializers import UserSerializer, TokenSerializer
 
 
-class UserCreateApiView(generics.CreateAPIView):
+class HashingBusyMixin:
+    """Answer 503 when the password hashing pool is saturated."""
+
+    hashing_retry_after = 1
+
+    def handle_exception(self, exc):
+        if isinstance(exc, HashingBusy):
+            return Response(
+                {'message': 'Too many concurrent logins, try again shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(self.hashing_retry_after)}
+            )
+
+        return super().handle_exception(exc)
+
+
+class UserCreateApiView(HashingBusyMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class UserTokenApiView(ObtainAuthToken):
+class UserTokenApiView(HashingBusyMixin, ObtainAuthToken):
     serializer_class = TokenSerializer
 
 
-class MeApiView(generics.RetrieveUpdateAPIView):
+class MeApiView(HashingBusyMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     def get_object(self):
 